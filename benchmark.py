@@ -0,0 +1,226 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from setup import Setup
+from evolution import EvolutionEngine
+from population import PopulationStore
+from runner import GenerationRecorder
+from shapes import ShapeTemplate
+
+
+# Times the placement and selection hot paths and whole runs at fixed seeds, on
+# the shipped instances and on larger synthetic ones, and compares the results
+# with a stored baseline.
+BENCHMARK_SEED = "benchmark"
+BENCHMARK_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+INSTANCES = [("50Shapes.txt", "50ShapesConfig1.json"),
+             ("100Shapes.txt", "100ShapesConfig1.json"),
+             ("100ShapesComplex.txt", "100ComplexShapesConfig1.json")]
+SYNTHETIC_CONFIG = "100ComplexShapesConfig1.json"
+SYNTHETIC_SHEET_WIDTH = 30
+MOVES = "UDLR"
+
+
+def generateProblem(path, numShapes, sheetWidth, seed):
+    # Writes a random instance in the problem file format. Shapes have 1 to 10
+    # steps of 1 to 5 cells like those of 100ShapesComplex.txt, and are redrawn
+    # until they fit across the sheet.
+    rng = random.Random(seed)
+    with open(path, 'w') as file:
+        file.write(str(sheetWidth) + " " + str(numShapes) + "\n")
+        for shape in range(numShapes):
+            while True:
+                steps = [rng.choice(MOVES) + str(rng.randint(1, 5)) for step in range(rng.randint(1, 10))]
+                if ShapeTemplate(steps).getLargestSide() < sheetWidth:
+                    break
+            file.write(" ".join(steps) + "\n")
+
+
+def timeOperation(operation, repetitions, rounds):
+    # Best mean time of one call over several rounds, which is the one least
+    # disturbed by other work on the machine. Every round starts from the same
+    # seed so that each does the same work.
+    best = None
+    for benchmarkRound in range(rounds):
+        random.seed(BENCHMARK_SEED)
+        start = time.perf_counter()
+        for repetition in range(repetitions):
+            operation()
+        elapsed = (time.perf_counter() - start) / repetitions
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def getBenchmarkConfig(setup, overrides):
+    # The instance's configuration with logging, checkpoints and early
+    # termination turned off.
+    configDict = dict(setup.configDict)
+    configDict["rngSeed"] = BENCHMARK_SEED
+    configDict["termination"] = "evaluations"
+    configDict["populationSeeding"] = False
+    configDict["logBuffering"] = False
+    configDict["statsFilePath"] = None
+    configDict["checkpointInterval"] = 0
+    configDict.update(overrides)
+    return configDict
+
+
+def benchmarkInstance(name, setup, overrides, repetitions, rounds):
+    configDict = getBenchmarkConfig(setup, overrides)
+    problemSpecs = setup.problemSpecs
+    random.seed(BENCHMARK_SEED)
+    engine = EvolutionEngine(configDict, problemSpecs, GenerationRecorder())
+    solutionGen = engine.solutionGen
+    numShapes = problemSpecs["numOfShapes"]
+    grid = solutionGen.getEmptyGrid()
+    results = {}
+
+    results["getRandomSolution"] = timeOperation(lambda: solutionGen.getRandomSolution(grid), repetitions, rounds)
+
+    # Repairs a uniform crossover of two individuals, one addNewGene call per gene.
+    parents = [engine.population[0].shapeCoords, engine.population[1].shapeCoords]
+    mixedGenes = [list(parents[geneNum % 2][geneNum]) for geneNum in range(numShapes)]
+
+    def repairMixedGenes():
+        grid.clear()
+        validSolution = []
+        for geneNum in range(numShapes):
+            validSolution = solutionGen.addNewGene(geneNum, mixedGenes[geneNum], validSolution, grid)
+    results["addNewGene"] = timeOperation(repairMixedGenes, repetitions, rounds) / numShapes
+
+    # Probes random placements against a sheet holding a whole solution.
+    grid.clear()
+    for geneNum in range(numShapes):
+        grid.place(solutionGen.shapeTemplates[geneNum], parents[0][geneNum])
+    random.seed(BENCHMARK_SEED)
+    probes = [(solutionGen.shapeTemplates[random.randrange(numShapes)], solutionGen._getRandomCoordsConstrained())
+              for probe in range(1000)]
+
+    def probePlacements():
+        for template, coords in probes:
+            solutionGen._coordsAreValid(grid, template, coords)
+    results["_coordsAreValid"] = timeOperation(probePlacements, repetitions, rounds) / len(probes)
+
+    ranks = engine._getRanking(engine.population).ranks
+    candidates = range(len(engine.population))
+    tournaments = 1000
+
+    def runTournaments():
+        for tournament in range(tournaments):
+            engine._kTournament(candidates, ranks, configDict["parentTournament"])
+    results["_kTournament"] = timeOperation(runTournaments, repetitions, rounds) / tournaments
+
+    # The offspring are appended to the population store, and survival
+    # selection cuts it back down, so every selection starts from a fresh copy
+    # of the pool whose construction is timed apart and subtracted.
+    offspringCount = configDict["offspringCount"]
+    random.seed(BENCHMARK_SEED)
+    engine._createOffspringPool(offspringCount)
+    results["getLevels"] = timeOperation(lambda: engine.solutionTracker.getLevels(engine.population),
+                                         repetitions, rounds)
+    selectionPool = list(engine.population)
+
+    def restorePool():
+        engine.population = PopulationStore(numShapes, selectionPool)
+        engine._populationChanged()
+
+    def selectSurvivors():
+        restorePool()
+        engine._survivalSelection(offspringCount)
+    results["_survivalSelection"] = max(timeOperation(selectSurvivors, repetitions, rounds) -
+                                        timeOperation(restorePool, repetitions, rounds), 0)
+
+    def evolve():
+        EvolutionEngine(configDict, problemSpecs, GenerationRecorder()).evolvePopulation()
+    results["evolvePopulation"] = timeOperation(evolve, 1, rounds)
+
+    return {name + " " + operation: seconds for operation, seconds in results.items()}
+
+
+def runBenchmarks(arguments):
+    results = {}
+    for problemFile, configFile in INSTANCES:
+        setup = Setup([os.path.join(BENCHMARK_DIRECTORY, problemFile), os.path.join(BENCHMARK_DIRECTORY, configFile)])
+        results.update(benchmarkInstance(problemFile, setup, {"numEvals": arguments.evals},
+                                         arguments.repetitions, arguments.rounds))
+
+    # Synthetic instances show how the hot paths scale with the number of shapes,
+    # so they use a small population and budget.
+    directory = tempfile.mkdtemp()
+    try:
+        for size in arguments.sizes:
+            problemPath = os.path.join(directory, "synthetic" + str(size) + ".txt")
+            generateProblem(problemPath, size, SYNTHETIC_SHEET_WIDTH, BENCHMARK_SEED + ":" + str(size))
+            setup = Setup([problemPath, os.path.join(BENCHMARK_DIRECTORY, SYNTHETIC_CONFIG)])
+            overrides = {"populationSize": 10, "offspringCount": 5, "numEvals": 30}
+            results.update(benchmarkInstance("synthetic" + str(size), setup, overrides, 1, arguments.rounds))
+    finally:
+        shutil.rmtree(directory)
+
+    return {"python": platform.python_version(), "platform": platform.platform(), "seed": BENCHMARK_SEED,
+            "evals": arguments.evals, "results": results}
+
+
+def compareResults(baseline, current, threshold):
+    # Prints the change of every benchmark in both runs and returns how many
+    # got slower by more than threshold.
+    regressions = 0
+    print("benchmark".ljust(44) + "baseline".rjust(14) + "current".rjust(14) + "change".rjust(10))
+    for name in sorted(current["results"]):
+        if name not in baseline["results"]:
+            continue
+        before = baseline["results"][name]
+        after = current["results"][name]
+        change = after / before - 1 if before > 0 else 0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif change < -threshold:
+            flag = "  improved"
+        print(name.ljust(44) + ("%.3e" % before).rjust(14) + ("%.3e" % after).rjust(14) +
+              ("%+.1f%%" % (100 * change)).rjust(10) + flag)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Times the evolutionary algorithm's hot paths.")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare the results with this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative slowdown reported as a regression (default 0.1)")
+    parser.add_argument("--evals", type=int, default=2000, help="evaluations of each end-to-end run")
+    parser.add_argument("--repetitions", type=int, default=10, help="calls per timing round")
+    parser.add_argument("--rounds", type=int, default=3, help="timing rounds, of which the best is kept")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1000, 10000],
+                        help="shape counts of the synthetic instances")
+    arguments = parser.parse_args()
+
+    current = runBenchmarks(arguments)
+    if arguments.output:
+        with open(arguments.output, 'w') as file:
+            json.dump(current, file, indent=2, sort_keys=True)
+
+    if arguments.baseline:
+        try:
+            with open(arguments.baseline, 'r') as file:
+                baseline = json.load(file)
+        except FileNotFoundError:
+            print("Baseline file could not be opened.")
+            sys.exit()
+        if compareResults(baseline, current, arguments.threshold):
+            sys.exit(1)
+    else:
+        for name in sorted(current["results"]):
+            print(name.ljust(44) + ("%.3e" % current["results"][name]).rjust(14))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import os
+import random
+import struct
+import sys
+from array import array
+from solution import SolutionTracker
+from solution import packSolutions
+from solution import unpackSolutions
+
+
+# A checkpoint is a fixed header followed by length-prefixed sections: the
+# random module's state, the population, the tracker's records and archive, the
+# archive of the runs finished before the checkpoint, and the evaluation
+# cache's counters and entries. Solutions use the same packed form as
+# migration between islands.
+CHECKPOINT_MAGIC = b"SECK"
+CHECKPOINT_VERSION = 2
+CHECKPOINT_HEADER = struct.Struct("<4sBIqqqq")
+SECTION_LENGTH = struct.Struct("<Q")
+RNG_GAUSS = struct.Struct("<?d")
+
+
+def _packRandomState(state):
+    version, internalState, gaussNext = state
+    return array('I', internalState).tobytes() + RNG_GAUSS.pack(gaussNext is not None, gaussNext or 0.0)
+
+
+def _unpackRandomState(data):
+    internalState = array('I')
+    internalState.frombytes(data[:-RNG_GAUSS.size])
+    hasGauss, gaussNext = RNG_GAUSS.unpack(data[-RNG_GAUSS.size:])
+    return (3, tuple(internalState), gaussNext if hasGauss else None)
+
+
+def _packRecords(tracker):
+    return [array('d', tracker.averageLengthFitnessRecords).tobytes(),
+            array('q', tracker.bestLengthFitnessRecords).tobytes(),
+            array('d', tracker.averageWidthFitnessRecords).tobytes(),
+            array('q', tracker.bestWidthFitnessRecords).tobytes(),
+            array('b', tracker.frontChangeRecords).tobytes()]
+
+
+def _unpackRecords(sections, tracker):
+    records = []
+    for typecode, data in zip("dqdqb", sections):
+        values = array(typecode)
+        values.frombytes(data)
+        records.append(values.tolist())
+    tracker.averageLengthFitnessRecords, tracker.bestLengthFitnessRecords, \
+        tracker.averageWidthFitnessRecords, tracker.bestWidthFitnessRecords, \
+        tracker.frontChangeRecords = records
+
+
+def _packCache(engine):
+    # The counters, then (valid, length, width) and the genome key of every
+    # entry from least to most recently used. All keys have the same length.
+    cache = engine.evaluationCache
+    counters = [0, 0, 0, engine.uncountedHitsLeft]
+    entries = array('q')
+    keys = array('q')
+    if cache is not None:
+        counters[:3] = [cache.hits, cache.misses, cache.evictions]
+        for key, entry in cache.entries.items():
+            entries.extend(entry)
+            keys.extend(key)
+    return [array('q', counters).tobytes(), entries.tobytes(), keys.tobytes()]
+
+
+def _unpackCache(sections):
+    counters, entries, keys = array('q'), array('q'), array('q')
+    counters.frombytes(sections[0])
+    entries.frombytes(sections[1])
+    keys.frombytes(sections[2])
+    count = len(entries) // 3
+    keyLength = len(keys) // count if count else 0
+    cacheEntries = []
+    for index in range(count):
+        valid, length, width = entries[index * 3:index * 3 + 3]
+        cacheEntries.append((tuple(keys[index * keyLength:(index + 1) * keyLength]), (bool(valid), length, width)))
+    return counters.tolist(), cacheEntries
+
+
+def saveCheckpoint(path, run, engine, archive, logOffset, statsRows):
+    # The file is written next to its destination and moved over it, so a
+    # crash while saving leaves the previous checkpoint intact.
+    header = CHECKPOINT_HEADER.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION, run, engine.evalsLeft,
+                                    engine.evalsCompleted, logOffset, statsRows)
+    sections = [_packRandomState(random.getstate()), packSolutions(list(engine.population))]
+    sections += _packRecords(engine.solutionTracker)
+    sections += [packSolutions(engine.solutionTracker.bestFront), packSolutions(archive.getSolutions())]
+    sections += _packCache(engine)
+
+    temporaryPath = path + ".tmp"
+    with open(temporaryPath, 'wb') as file:
+        file.write(header)
+        for section in sections:
+            file.write(SECTION_LENGTH.pack(len(section)))
+            file.write(section)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporaryPath, path)
+
+
+def loadCheckpoint(path, archiveSize):
+    try:
+        with open(path, 'rb') as file:
+            data = file.read()
+    except FileNotFoundError:
+        print("Checkpoint file could not be opened.")
+        sys.exit()
+
+    if len(data) < CHECKPOINT_HEADER.size or data[:len(CHECKPOINT_MAGIC)] != CHECKPOINT_MAGIC:
+        print("Invalid checkpoint file.")
+        sys.exit()
+    magic, version, run, evalsLeft, evalsCompleted, logOffset, statsRows = CHECKPOINT_HEADER.unpack_from(data)
+    if version != CHECKPOINT_VERSION:
+        print("Unsupported checkpoint version.")
+        sys.exit()
+
+    sections = []
+    offset = CHECKPOINT_HEADER.size
+    while offset < len(data):
+        length = SECTION_LENGTH.unpack_from(data, offset)[0]
+        offset += SECTION_LENGTH.size
+        sections.append(data[offset:offset + length])
+        offset += length
+
+    tracker = SolutionTracker(archiveSize)
+    _unpackRecords(sections[2:7], tracker)
+    tracker.archive.insertAll(unpackSolutions(sections[7]))
+    cacheCounters, cacheEntries = _unpackCache(sections[9:12])
+    return {"run": run, "evalsLeft": evalsLeft, "evalsCompleted": evalsCompleted, "logOffset": logOffset,
+            "statsRows": statsRows, "rngState": _unpackRandomState(sections[0]),
+            "population": unpackSolutions(sections[1]), "tracker": tracker,
+            "archive": unpackSolutions(sections[8]), "cacheCounters": cacheCounters,
+            "cacheEntries": cacheEntries}
+
+
+# Saves a checkpoint of a serial run every checkpoint-interval generations,
+# together with how far the log and statistics files had been written.
+class Checkpointer:
+    def __init__(self, configDict, logger, archive, run):
+        self.configDict = configDict
+        self.logger = logger
+        self.archive = archive
+        self.run = run
+        self.generations = 0
+
+    def addGeneration(self, engine):
+        self.generations += 1
+        if self.generations % self.configDict["checkpointInterval"] != 0:
+            return
+        self.logger.flush()
+        logOffset = os.path.getsize(self.configDict["logFilePath"])
+        saveCheckpoint(self.configDict["checkpointFilePath"], self.run, engine, self.archive, logOffset,
+                       self.logger.getStatsRows())
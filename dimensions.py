@@ -0,0 +1,69 @@
+def getGeneExtent(template, gene, occupied):
+    # The [lowX, highX, lowY, highY] a gene contributes to the sheet's bounding
+    # box: its anchor alone, or every cell of the shape when occupied is set.
+    if not occupied:
+        return (gene[0], gene[0], gene[1], gene[1])
+    bounds = template.bounds[gene[2]]
+    return (gene[0] + bounds[0], gene[0] + bounds[1], gene[1] + bounds[2], gene[1] + bounds[3])
+
+
+def getGeneSides(template, gene, occupied):
+    # The sides of the bounding box a gene reaches, each as a value to maximise:
+    # highX and highY, and also -lowX and -lowY when occupied is set. In anchor
+    # mode the low sides are always 0.
+    if not occupied:
+        return (gene[0], gene[1])
+    bounds = template.bounds[gene[2]]
+    return (gene[0] + bounds[1], gene[1] + bounds[3], -gene[0] - bounds[0], -gene[1] - bounds[2])
+
+
+# The extremes of a genome hold, for every side of its bounding box, the most
+# extreme value a gene reaches and how many genes reach it, as a flat tuple
+# (highX, count, highY, count[, -lowX, count, -lowY, count]). The counts let an
+# offspring derive its extremes from its parent's in O(k) for k changed genes.
+def getSheetExtremes(templates, genome, occupied):
+    if not occupied:
+        columns = ([gene[0] for gene in genome], [gene[1] for gene in genome])
+    else:
+        sides = [getGeneSides(templates[geneNum], genome[geneNum], True) for geneNum in range(len(genome))]
+        columns = zip(*sides)
+
+    extremes = []
+    for column in columns:
+        extreme = max(column)
+        extremes += [extreme, column.count(extreme)]
+    return tuple(extremes)
+
+
+def updateSheetExtremes(templates, extremes, parentGenes, genome, geneNums, occupied):
+    # The extremes of genome, which matches the parent with the given extremes
+    # except at geneNums. parentGenes holds the parent's genes at geneNums, in
+    # the same order. Returns None when every gene that reached a side of the
+    # parent's box changed and none of the changed genes reaches it now, as the
+    # rest of the genome would then have to be scanned.
+    if not geneNums:
+        return extremes
+    oldSides = [getGeneSides(templates[geneNum], gene, occupied) for geneNum, gene in zip(geneNums, parentGenes)]
+    newSides = [getGeneSides(templates[geneNum], genome[geneNum], occupied) for geneNum in geneNums]
+    updated = []
+    for side in range(len(extremes) // 2):
+        extreme = extremes[side * 2]
+        unchanged = extremes[side * 2 + 1] - [sides[side] for sides in oldSides].count(extreme)
+        values = [sides[side] for sides in newSides]
+        newExtreme = max(values)
+        if newExtreme > extreme:
+            updated += [newExtreme, values.count(newExtreme)]
+        elif newExtreme == extreme:
+            updated += [extreme, unchanged + values.count(extreme)]
+        elif unchanged > 0:
+            updated += [extreme, unchanged]
+        else:
+            return None
+    return tuple(updated)
+
+
+def getExtremeDimensions(extremes, occupied):
+    # The [lowX, highX, lowY, highY] of the bounding box the extremes describe.
+    if not occupied:
+        return [0, extremes[0], 0, extremes[2]]
+    return [-extremes[4], extremes[0], -extremes[6], extremes[2]]
@@ -0,0 +1,41 @@
+from collections import OrderedDict
+
+
+# Validity and (length, width) of recently built offspring, keyed by their
+# genome after mutation and before repair. Only the capacity most recently used
+# genomes are kept, and lookups are counted so a run can report its hit rate.
+class EvaluationCache:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        # Only valid entries count as hits, since an invalid genome is still
+        # repaired and evaluated.
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        if entry[0]:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return entry
+
+    def put(self, key, entry):
+        self.entries[key] = entry
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def restore(self, entries, hits, misses, evictions):
+        # Refills the cache from (key, entry) pairs in least recently used order.
+        for key, entry in entries:
+            self.put(key, entry)
+        self.hits = hits
+        self.misses = misses
+        self.evictions = evictions
@@ -1,53 +1,253 @@
+import math
 import random
-import sys
+import time
+from itertools import chain
 from solution import SolutionGenerator
 from solution import Solution
 from solution import SolutionTracker
 from log import Logger
+from pareto import ParetoRanking
+from pareto import getMostCrowded
+from population import PopulationStore
+from dimensions import getExtremeDimensions
+from dimensions import getSheetExtremes
+from dimensions import updateSheetExtremes
+from metrics import Metrics
+from metrics import NULL_METRICS
+from seeds import readSeedGenomes
+from selection import CumulativeSampler
+from selection import sampleWithoutReplacement
+from steadystate import OffspringPool
+from evalcache import EvaluationCache
 
 
 class EvolutionEngine:
-    def __init__(self, configDict, problemSpecs):
+    def __init__(self, configDict, problemSpecs, logger=None, checkpoint=None):
         self.configDict = configDict
         self.problemSpecs = problemSpecs
         self.evalsLeft = self.configDict["numEvals"]
-        self.solutionGen = SolutionGenerator(self.problemSpecs)
-        self.solutionTracker = SolutionTracker()
-        self.logger = Logger(self.configDict)
-        self.problemSpecs["maxSheetLength"] = self.solutionGen.problemSpecs["maxSheetLength"]
-        self.population = self._initializePopulation()
+        self.evalsCompleted = self.configDict["populationSize"]
+        # The run's clock starts with the engine, so the time limit and the
+        # throughput include building the initial population.
+        self.runStart = time.perf_counter()
+        self.deadline = None
+        if self.configDict["termination"] in ("wall-clock", "combined"):
+            self.deadline = self.runStart + self.configDict["timeLimit"]
+        self.evalsAtStart = 0
+        self.generations = 0
+        # Offspring whose genome was built before are taken from the cache
+        # instead of being repaired and evaluated again. Hits that do not count
+        # as evaluations are capped at the run's evaluations, so a converged
+        # population that only breeds duplicates still ends its run. The
+        # parallel steady-state workers repair their offspring without it.
+        self.evaluationCache = None
+        if self.configDict["evaluationCacheSize"] > 0:
+            self.evaluationCache = EvaluationCache(self.configDict["evaluationCacheSize"])
+        self.uncountedHitsLeft = 0 if self.configDict["countCacheHits"] else self.configDict["numEvals"]
+        self.uncountedHits = 0
+        # Phase timers and retry counters, which do nothing unless instrumentation is on.
+        self.metrics = Metrics() if self.configDict["instrumentation"] else NULL_METRICS
+        # Steady-state offspring are built by a pool of workers when parallel
+        # workers are set, except on islands, which are processes of their own.
+        self.steadyState = self.configDict["survivalStrategy"] == "steady-state"
+        self.offspringWorkers = 1
+        if self.steadyState and self.configDict["islandCount"] == 1:
+            self.offspringWorkers = self.configDict["parallelWorkers"]
+        self.solutionGen = SolutionGenerator(self.problemSpecs, dimensionMode=self.configDict["dimensionMode"],
+                                             metrics=self.metrics)
+        self.solutionTracker = SolutionTracker(self.configDict["archiveSize"])
+        if logger is None:
+            logger = Logger(self.configDict)
+        self.logger = logger
+        self.populationRanking = None
+        self.parentSampler = None
+        if checkpoint is None:
+            self.population = self._initializePopulation()
+        else:
+            # Continues a run from a checkpoint instead of starting a new one.
+            self.evalsLeft = checkpoint["evalsLeft"]
+            self.evalsCompleted = checkpoint["evalsCompleted"]
+            self.evalsAtStart = self.evalsCompleted
+            self.solutionTracker = checkpoint["tracker"]
+            hits, misses, evictions, self.uncountedHitsLeft = checkpoint["cacheCounters"]
+            if self.evaluationCache is not None:
+                self.evaluationCache.restore(checkpoint["cacheEntries"], hits, misses, evictions)
+            self.population = PopulationStore(self.problemSpecs["numOfShapes"], checkpoint["population"])
+
+    def evolvePopulation(self, checkpointer=None):
+        if self.offspringWorkers > 1:
+            self._evolveSteadyStateInParallel()
+            self._logThroughput()
+            self.logCacheStats()
+            self.logRunMetrics()
+            return self.solutionTracker.bestFront
 
-    def evolvePopulation(self):
         endOfRun = False
         if self.evalsLeft == 0:
             endOfRun = True
-        evalsCompleted = self.configDict["populationSize"]
         while not endOfRun:
-            offspringPool = []
-            for evaluation in range(self.configDict["offspringCount"]):
-                if self.evalsLeft == 0:
-                    endOfRun = True
-                    break
-
-                offspring = self._createOffspring()
-                offspringPool.append(offspring)
-                evalsCompleted += 1
-                self.evalsLeft -= 1
-
-            survivors = self._survivalSelection(offspringPool)
-            self.population = survivors
-            self.solutionTracker.addGeneration(self.population)
-            self.logger.addGeneration(evalsCompleted, self.solutionTracker.bestLengthFitnessRecords[-1],
-                                      self.solutionTracker.averageLengthFitnessRecords[-1],
-                                      self.solutionTracker.bestWidthFitnessRecords[-1],
-                                      self.solutionTracker.averageWidthFitnessRecords[-1])
-
+            self.evolveGeneration()
             if self._willTerminate():
                 endOfRun = True
+            elif checkpointer is not None:
+                checkpointer.addGeneration(self)
 
+        self._logThroughput()
+        self.logCacheStats()
+        self.logRunMetrics()
         return self.solutionTracker.bestFront
 
+    def evolveGeneration(self):
+        if self.steadyState:
+            # A steady-state generation is offspring-count insertions, each
+            # offspring bred from the population the one before it left. The
+            # ranking is taken before the offspring joins the store.
+            for offspring in range(min(self.configDict["offspringCount"], self.evalsLeft)):
+                ranking = self._getRanking(self.population)
+                self._createOffspringPool(1)
+                self._countEvaluations(1)
+                self._insertOffspring(ranking)
+            self._trackGeneration()
+            return
+
+        offspringCount = min(self.configDict["offspringCount"], self.evalsLeft)
+        self._createOffspringPool(offspringCount)
+        self._countEvaluations(offspringCount)
+
+        start = self.metrics.startTimer()
+        self._survivalSelection(offspringCount)
+        self.metrics.stopTimer("survivalSelection", start)
+        self._trackGeneration()
+
+    def _countEvaluations(self, offspringCount):
+        # Charges the offspring of the last pool, less its uncounted cache hits.
+        evals = offspringCount - self.uncountedHits
+        self.evalsCompleted += evals
+        self.evalsLeft -= evals
+
+    def _evolveSteadyStateInParallel(self):
+        # Keeps every worker busy with offspring bred from the current
+        # population and inserts each one as soon as it is finished. An
+        # evaluation is taken from the budget when its offspring is submitted,
+        # so the run never goes over it, and offspring still being built when
+        # the front stops changing are abandoned uncounted.
+        maxInFlight = self.offspringWorkers * 2
+        inFlight = 0
+        insertions = 0
+        with OffspringPool(self.configDict, self.problemSpecs, self.offspringWorkers) as offspringPool:
+            while True:
+                while inFlight < maxInFlight and self.evalsLeft > 0:
+                    offspringPool.submit(self._breedOffspring(), random.getrandbits(64))
+                    self.evalsLeft -= 1
+                    inFlight += 1
+                if inFlight == 0:
+                    break
+
+                child = offspringPool.getOffspring()
+                inFlight -= 1
+                self.evalsCompleted += 1
+                ranking = self._getRanking(self.population)
+                self.population.append(child)
+                self._insertOffspring(ranking)
+                insertions += 1
+                if insertions == self.configDict["offspringCount"] or inFlight == 0:
+                    insertions = 0
+                    self._trackGeneration()
+                    if self.limitReached():
+                        break
+
+    def _breedOffspring(self):
+        # An unrepaired offspring, with its mutated genes moved, for a worker.
+        metrics = self.metrics
+        start = metrics.startTimer()
+        parent1Index, parent2Index = self._selectParents()
+        metrics.stopTimer("selectParents", start)
+        start = metrics.startTimer()
+        numShapes = self.problemSpecs["numOfShapes"]
+        offspring, changedGenes = self._crossover(parent1Index, parent2Index, random.getrandbits(numShapes))
+        metrics.stopTimer("crossover", start)
+        start = metrics.startTimer()
+        offspring = self._mutateOffspring(offspring, self._getMutationMasks(1, numShapes)[0])
+        metrics.stopTimer("mutation", start)
+        return offspring
+
+    def _insertOffspring(self, ranking):
+        # Ranks the offspring in the store's last row, which ranking does not
+        # hold yet, and evicts the most crowded member of the last level, which
+        # may be the offspring itself. The offspring takes the evicted member's
+        # row, so the ranking and the store are updated in place rather than
+        # rebuilt.
+        start = self.metrics.startTimer()
+        newIndex = len(self.population) - 1
+        ranking.insert(newIndex)
+        lastLevel = ranking.levelKeys[-1]
+        removed = lastLevel[getMostCrowded([key[0] for key in lastLevel], [key[1] for key in lastLevel])][2]
+        ranking.remove(removed)
+        if removed != newIndex:
+            ranking.move(newIndex, removed)
+            self.population.replace(removed, self.population[newIndex], self.population.extremes[newIndex])
+        self.population.pop()
+        ranking.ranks.pop()
+        self.parentSampler = None
+        self.metrics.stopTimer("survivalSelection", start)
+
+    def _trackGeneration(self):
+        self.generations += 1
+        start = self.metrics.startTimer()
+        self.solutionTracker.addGeneration(self.population, self._getRanking(self.population).getLevels())
+        self.metrics.stopTimer("tracking", start)
+        self._logGeneration(self.evalsCompleted)
+
+    def _logGeneration(self, evals):
+        start = self.metrics.startTimer()
+        self.logger.addGeneration(evals, self.solutionTracker.bestLengthFitnessRecords[-1],
+                                  self.solutionTracker.averageLengthFitnessRecords[-1],
+                                  self.solutionTracker.bestWidthFitnessRecords[-1],
+                                  self.solutionTracker.averageWidthFitnessRecords[-1])
+        self.metrics.stopTimer("logging", start)
+        if self.metrics.enabled:
+            times, counts = self.metrics.endGeneration()
+            self.logger.addMetrics(evals, times, counts)
+
+    def _logThroughput(self):
+        # Evaluations and generations of this engine only, so a resumed run
+        # reports the throughput since it was resumed. Like the phase timers,
+        # it is only logged when instrumentation is on.
+        if self.metrics.enabled:
+            self.logger.addThroughput(self.evalsCompleted - self.evalsAtStart, self.generations,
+                                      time.perf_counter() - self.runStart)
+
+    def logCacheStats(self):
+        cache = self.evaluationCache
+        if cache is not None:
+            self.logger.addCacheStats(cache.hits, cache.misses, cache.evictions)
+
+    def logRunMetrics(self):
+        if self.metrics.enabled:
+            times, counts = self.metrics.endRun()
+            self.logger.addRunMetrics(times, counts)
+
+    def getFront(self):
+        return [self.population[index] for index in self._getRanking(self.population).getLevels()[0]]
+
+    def addImmigrants(self, immigrants):
+        # Immigrants replace the same number of the lowest ranked individuals,
+        # so the population keeps its size. They were evaluated on the island
+        # they came from and cost no evaluations here.
+        immigrants = immigrants[:len(self.population)]
+        if not immigrants:
+            return
+
+        ranking = self._getRanking(self.population)
+        byRank = sorted(range(len(self.population)), key=lambda index: ranking.ranks[index])
+        self.population.keep(byRank[:len(self.population) - len(immigrants)])
+        for immigrant in immigrants:
+            self.population.append(immigrant)
+        self.population.keep(self._shufflePopulation(list(range(len(self.population)))))
+        self._populationChanged()
+
     def _initializePopulation(self):
+        start = self.metrics.startTimer()
         population = []
         remainingPopulation = self.configDict["populationSize"]
         if self.configDict["populationSeeding"]:
@@ -57,49 +257,30 @@ class EvolutionEngine:
         randomGenPopulation = self._getRandomIndividuals(remainingPopulation)
         population += randomGenPopulation
         population = self._shufflePopulation(population.copy())
+        self.population = PopulationStore(self.problemSpecs["numOfShapes"], population)
+        self._populationChanged()
+        self.metrics.stopTimer("initialization", start)
 
-        self.solutionTracker.addGeneration(population)
+        start = self.metrics.startTimer()
+        self.solutionTracker.addGeneration(self.population, self._getRanking(self.population).getLevels())
         # For front convergence tracking, the front changed from empty to full.
         self.solutionTracker.frontChangeRecords.append(1)
-        self.logger.addGeneration(self.configDict["populationSize"], self.solutionTracker.bestLengthFitnessRecords[-1],
-                                  self.solutionTracker.averageLengthFitnessRecords[-1],
-                                  self.solutionTracker.bestWidthFitnessRecords[-1],
-                                  self.solutionTracker.averageWidthFitnessRecords[-1])
-        return population
+        self.metrics.stopTimer("tracking", start)
+        self._logGeneration(self.configDict["populationSize"])
+        return self.population
 
     def _getSeededIndividuals(self):
-        try:
-            with open(self.configDict["seedFilePath"], 'r') as file:
-                seedData = []
-                for line in file:
-                    seedData.append(line.rstrip('\n'))
-        except FileNotFoundError:
-            print("Population seed file could not be opened.")
-            sys.exit()
-
-        solutionLength = self.problemSpecs["numOfShapes"]
-        numberOfSolutions = int(seedData[0])
-        del seedData[0]
-
-        # Only retrieve first mu solutions from seed file if it contains more than mu solutions
-        if numberOfSolutions > self.configDict["populationSize"]:
-            numberOfSolutions = self.configDict["populationSize"]
+        # Seed solutions are read one at a time and checked against one reused grid.
+        seedGenomes = readSeedGenomes(self.configDict["seedFilePath"], self.problemSpecs["numOfShapes"])
+        grid = self.solutionGen.getEmptyGrid()
 
         population = []
-        for solution in range(numberOfSolutions):
-            if self.evalsLeft == 0:
+        for solution, solutionCoords in enumerate(seedGenomes):
+            # Only retrieve first mu solutions from seed file if it contains more than mu solutions
+            if self.evalsLeft == 0 or solution == self.configDict["populationSize"]:
                 break
 
-            solutionCoords = []
-            for coord in range(solutionLength):
-                addCoord = seedData[0]
-                del seedData[0]
-                addCoord = [int(num) for num in addCoord.split(",")]
-                solutionCoords.append(addCoord)
-            if seedData:
-                del seedData[0]
-
-            if not self.solutionGen.solutionIsValid(solutionCoords):
+            if not self.solutionGen.solutionIsValid(solutionCoords, grid):
                 continue
 
             solutionDimensions = self.solutionGen.getSheetDimensionsConstrained(solutionCoords)
@@ -121,7 +302,10 @@ class EvolutionEngine:
         for individual in range(size):
             if self.evalsLeft == 0:
                 break
-            indiv = self.solutionGen.getRandomSolution()
+            if self.configDict["initialization"] == "bottom-left-fill":
+                indiv = self.solutionGen.getBottomLeftSolution()
+            else:
+                indiv = self.solutionGen.getRandomSolution()
             population.append(indiv)
             self.evalsLeft -= 1
 
@@ -131,25 +315,113 @@ class EvolutionEngine:
         random.shuffle(population)
         return population
 
-    def _createOffspring(self):
-        parent1Index, parent2Index = self._selectParents()
-        parent1, parent2 = self.population[parent1Index], self.population[parent2Index]
-        offspring = self._recombine(parent1, parent2)
-        if self.configDict["mutationRate"] > 0:
-            offspring = self._mutateOffspring(offspring.copy())
-
-        offspringDimensions = self.solutionGen.getSheetDimensionsConstrained(offspring)
+    def _createOffspringPool(self, offspringCount):
+        # Parents, crossover masks and mutation masks are drawn for the whole
+        # generation up front, and the genes are read from the population store.
+        # Only repairing collisions is done shape by shape. The offspring are
+        # appended to the store after the parents.
+        metrics = self.metrics
+        start = metrics.startTimer()
+        numShapes = self.problemSpecs["numOfShapes"]
+        parentPairs = [self._selectParents() for offspring in range(offspringCount)]
+        metrics.stopTimer("selectParents", start)
+        start = metrics.startTimer()
+        crossoverMasks = random.getrandbits(offspringCount * numShapes)
+        metrics.stopTimer("crossover", start)
+        start = metrics.startTimer()
+        mutationMasks = self._getMutationMasks(offspringCount, numShapes)
+        metrics.stopTimer("mutation", start)
+
+        self.uncountedHits = 0
+        for offspringNum in range(offspringCount):
+            start = metrics.startTimer()
+            parent1Index, parent2Index = parentPairs[offspringNum]
+            crossoverMask = (crossoverMasks >> (offspringNum * numShapes)) & ((1 << numShapes) - 1)
+            offspring, changedGenes = self._crossover(parent1Index, parent2Index, crossoverMask)
+            metrics.stopTimer("crossover", start)
+            start = metrics.startTimer()
+            offspring = self._mutateOffspring(offspring, mutationMasks[offspringNum])
+            changedGenes += mutationMasks[offspringNum]
+            metrics.stopTimer("mutation", start)
+            start = metrics.startTimer()
+            # Mutated genes already hold their new placements, so an offspring is
+            # determined by its genome: if no gene collides, repair keeps every
+            # gene and draws no random numbers, and a cached valid genome gives
+            # the same offspring without repair. Invalid genomes are repaired.
+            cacheKey = None
+            if self.evaluationCache is not None:
+                cacheKey = tuple(chain.from_iterable(offspring))
+                cached = self.evaluationCache.get(cacheKey)
+                if cached is not None and cached[0]:
+                    self.population.append(self._getCachedOffspring(offspring, cached))
+                    metrics.stopTimer("evaluation", start)
+                    continue
+                elif cached is not None:
+                    cacheKey = None
+            geneChanges = len(changedGenes)
+            offspring = self.solutionGen.repairSolution(offspring, changedGenes)
+            metrics.stopTimer("repair", start)
+            start = metrics.startTimer()
+            child, extremes = self._evaluateOffspring(offspring, parent1Index, changedGenes)
+            if cacheKey is not None:
+                self.evaluationCache.put(cacheKey, (len(changedGenes) == geneChanges, child.length, child.width))
+            self.population.append(child, extremes)
+            metrics.stopTimer("evaluation", start)
+
+    def _getCachedOffspring(self, offspring, cached):
+        if self.uncountedHitsLeft > 0:
+            self.uncountedHitsLeft -= 1
+            self.uncountedHits += 1
+        child = Solution(offspring, cached[1], cached[2])
+        child.lengthFitness = self.problemSpecs["maxSheetLength"] - child.length
+        child.widthFitness = self.problemSpecs["sheetWidth"] - child.width
+        return child
+
+    def _populationChanged(self):
+        # The Pareto ranks and parent sampler of the population are kept until
+        # its rows change.
+        self.populationRanking = None
+        self.parentSampler = None
+
+    def _evaluateOffspring(self, offspring, parentIndex, changedGenes):
+        # Returns the offspring as a Solution together with its extremes. When
+        # at most a quarter of the genes differ from the parent, the extremes
+        # are derived from the parent's; otherwise, or when that is not
+        # possible, the whole genome is scanned.
+        templates = self.solutionGen.shapeTemplates
+        occupied = self.solutionGen.occupiedDimensions
+        changedGenes = sorted(set(changedGenes))
+        extremes = None
+        if len(changedGenes) * 4 <= len(offspring):
+            parentGenes = [self.population.getGene(parentIndex, geneNum) for geneNum in changedGenes]
+            extremes = updateSheetExtremes(templates, self._getExtremes(parentIndex), parentGenes, offspring,
+                                           changedGenes, occupied)
+        if extremes is None:
+            extremes = getSheetExtremes(templates, offspring, occupied)
+
+        offspringDimensions = getExtremeDimensions(extremes, occupied)
         offspringLength = offspringDimensions[1] + 1
         offspringWidth = offspringDimensions[3] + 1
         mutatedOffspringSolution = Solution(offspring, offspringLength, offspringWidth)
         mutatedOffspringSolution.lengthFitness = self.problemSpecs["maxSheetLength"] - offspringLength
         mutatedOffspringSolution.widthFitness = self.problemSpecs["sheetWidth"] - offspringWidth
-        return mutatedOffspringSolution
+        return mutatedOffspringSolution, extremes
+
+    def _getExtremes(self, individual):
+        # Rows that were not bred here, such as the initial population and
+        # immigrants, have their extremes found when they first become parents.
+        if self.population.extremes[individual] is None:
+            self.population.extremes[individual] = getSheetExtremes(
+                self.solutionGen.shapeTemplates, self.population.getGenome(individual),
+                self.solutionGen.occupiedDimensions)
+        return self.population.extremes[individual]
 
     def _selectParents(self):
         if self.configDict["parentSelection"] == "k-tournament":
-            parent1Index = self._kTournament(self.population, self.configDict["parentTournament"])
-            parent2Index = self._kTournament(self.population, self.configDict["parentTournament"])
+            ranks = self._getRanking(self.population).ranks
+            candidates = range(len(self.population))
+            parent1Index = self._kTournament(candidates, ranks, self.configDict["parentTournament"])
+            parent2Index = self._kTournament(candidates, ranks, self.configDict["parentTournament"])
         elif self.configDict["parentSelection"] == "fitness-proportional":
             parent1Index, parent2Index = self._parentFitnessProportional()
         else:
@@ -157,77 +429,47 @@ class EvolutionEngine:
 
         return parent1Index, parent2Index
 
-    def _kTournament(self, population, tournamentSize):
-        if len(population) < tournamentSize:
-            tournamentSize = len(population)
+    def _getRanking(self, population):
+        # Rankings of the current population are shared by parent selection and
+        # the tracker until its rows change.
+        if population is not self.population:
+            return ParetoRanking(population)
+        if self.populationRanking is None:
+            self.populationRanking = ParetoRanking(self.population)
+        return self.populationRanking
+
+    def _kTournament(self, candidates, ranks, tournamentSize):
+        # Returns the position in candidates of the winner, ranking each
+        # candidate by ranks[candidate].
+        if len(candidates) < tournamentSize:
+            tournamentSize = len(candidates)
 
-        levels = self.solutionTracker.getLevels(population)
-        levelToIndex = [0] * len(population)
-        for level in range(len(levels)):
-            for ind in levels[level]:
-                levelToIndex[ind] = level
-
-        participantIndex = []
         winnerIndex = -1
-        for choice in range(tournamentSize):
-            while True:
-                index = random.randint(0, len(population) - 1)
-                if index not in participantIndex:
-                    participantIndex.append(index)
-                    if winnerIndex == -1:
-                        winnerIndex = index
-                        break
-                    if levelToIndex[index] > levelToIndex[winnerIndex]:
-                        winnerIndex = index
-                    break
+        for index in random.sample(range(len(candidates)), tournamentSize):
+            if winnerIndex == -1 or ranks[candidates[index]] < ranks[candidates[winnerIndex]]:
+                winnerIndex = index
 
         return winnerIndex
 
     def _parentFitnessProportional(self):
-        fitnessProportions = self._calcFitnessProportions(self.population)
-        parentIndices = []
-
-        totalProb = 0
-        for probability in fitnessProportions:
-            totalProb += probability
-
-        validParents = False
-        while not validParents:
-            place = 0
-            index = 0
-            randFloat = random.uniform(0, totalProb)
-            for probability in fitnessProportions:
-                if randFloat <= (place + probability):
-                    if index not in parentIndices:
-                        parentIndices.append(index)
-                        if len(parentIndices) == 2:
-                            validParents = True
-                        break
-                    else:
-                        break
-                else:
-                    place += probability
-                    index += 1
-        return parentIndices[0], parentIndices[1]
+        # The population's prefix sums are shared by every parent drawn until
+        # its rows change.
+        if self.parentSampler is None:
+            self.parentSampler = CumulativeSampler(self._calcFitnessProportions(self.population))
+        parent1Index, parent2Index = self.parentSampler.sampleDistinct(2)
+        return parent1Index, parent2Index
 
     def _calcFitnessProportions(self, population):
-        levels = self.solutionTracker.getLevels(population)
+        # Every solution is weighted by its level, starting at 100 for the first
+        # level and halving with each level after it.
+        levels = self._getRanking(population).getLevels()
         fitnessProportions = [0] * len(population)
         currVal = 100
-        levelValues = []
         for level in levels:
-            levelValues.append(currVal)
+            for solution in level:
+                fitnessProportions[solution] = currVal
             currVal /= 2
 
-        for level in range(len(levels)):
-            for solution in levels[level]:
-                fitnessProportions[solution] = levelValues[level]
-
-        currProb = fitnessProportions[0]
-        for prob in range(1, len(fitnessProportions)):
-            currProb += fitnessProportions[prob]
-            fitnessProportions[prob] = currProb
-
         return fitnessProportions
 
     def _uniformRandomParents(self):
@@ -239,46 +481,55 @@ class EvolutionEngine:
 
         return parentIndices[0], parentIndices[1]
 
-    def _recombine(self, parent1, parent2):
-        offspring = self._crossover(parent1, parent2)
-        return offspring
+    def _crossover(self, parent1Index, parent2Index, crossoverMask):
+        # Uniform crossover; the offspring may still overlap until it is repaired.
+        return self.population.crossover(parent1Index, parent2Index, crossoverMask)
 
-    def _crossover(self, parent1, parent2):
-        offspringCoords = []
-        for geneNum in range(len(parent1.shapeCoords)):
-            whichParent = random.randint(0, 1)
-            addGene = []
-            if whichParent == 0:
-                addGene = parent1.shapeCoords[geneNum]
+    def _getMutationMasks(self, offspringCount, numShapes):
+        # The genes to mutate in each offspring. Gaps between mutated genes are
+        # drawn from the geometric distribution, which mutates every gene with
+        # probability mutationRate while only drawing one number per mutation.
+        masks = [[] for offspring in range(offspringCount)]
+        mutationRate = self.configDict["mutationRate"]
+        if mutationRate <= 0:
+            return masks
+
+        position = -1
+        while True:
+            if mutationRate >= 1:
+                position += 1
             else:
-                addGene = parent2.shapeCoords[geneNum]
-            offspringCoords = self.solutionGen.addNewGene(geneNum, addGene, offspringCoords.copy())
+                position += 1 + int(math.log(1.0 - random.random()) / math.log(1.0 - mutationRate))
+            if position >= offspringCount * numShapes:
+                break
+            masks[position // numShapes].append(position % numShapes)
+        return masks
 
-        return offspringCoords
+    def _mutateOffspring(self, offspring, mutationMask):
+        # Mutated genes are moved to a random placement anywhere on the sheet.
+        # Repair keeps the placement if it fits and draws a new one otherwise.
+        for gene in mutationMask:
+            offspring[gene] = self.solutionGen._getRandomCoordsConstrained()
 
-    def _mutateOffspring(self, offspring):
-        probabilities = []
-        mutationRate = self.configDict["mutationRate"]
-        for gene in range(len(offspring)):
-            probabilities.append(random.uniform(0, 1))
-        for gene in range(len(offspring)):
-            if probabilities[gene] < mutationRate:
-                offspring[gene] = []
-        mutated = self.solutionGen.addMutations(offspring)
-
-        return mutated
+        return offspring
 
-    def _survivalSelection(self, offspringPool):
-        selectionPopulation = []
+    def _survivalSelection(self, offspringCount):
+        # The offspring sit after the parents in the population store. The rows
+        # competing for survival are shuffled into place first, and the store is
+        # then cut down to the survivors.
         poolSize = self.configDict["populationSize"]
+        parentCount = len(self.population) - offspringCount
+        offspringRows = list(range(parentCount, len(self.population)))
         if self.configDict["survivalStrategy"] == "comma":
-            if len(offspringPool) < self.configDict["populationSize"]:
-                poolSize = len(offspringPool)
-            selectionPopulation = offspringPool.copy()
+            if offspringCount < self.configDict["populationSize"]:
+                poolSize = offspringCount
+            selectionRows = offspringRows
         else:
-            selectionPopulation = offspringPool.copy() + self.population.copy()
+            selectionRows = offspringRows + list(range(parentCount))
 
-        selectionPopulation = self._shufflePopulation(selectionPopulation.copy())
+        self.population.keep(self._shufflePopulation(selectionRows))
+        self._populationChanged()
+        selectionPopulation = self.population
         survivors = []
         if self.configDict["survivalSelection"] == "uniform-random":
             survivors = self._randomSurvival(selectionPopulation, poolSize)
@@ -289,80 +540,48 @@ class EvolutionEngine:
         elif self.configDict["survivalSelection"] == "k-tournament":
             survivors = self._tournamentSurvival(selectionPopulation, poolSize)
 
-        return survivors
+        self.population.keep(survivors)
+        self._populationChanged()
 
+    # The survival methods return the rows of the selection population that
+    # survive, in order.
     def _randomSurvival(self, selectionPopulation, poolSize):
-        survivors = []
-        survivorIndices = []
-        for survivor in range(poolSize):
-            choice = random.randint(0, len(selectionPopulation) - 1)
-            while choice in survivorIndices:
-                choice = random.randint(0, len(selectionPopulation) - 1)
-            survivorIndices.append(choice)
-
-        for survivor in survivorIndices:
-            survivors.append(selectionPopulation[survivor])
-
-        return survivors
+        return random.sample(range(len(selectionPopulation)), poolSize)
 
     def _truncationSurvival(self, selectionPopulation, poolSize):
-        survivors = []
-        levels = self.solutionTracker.getLevels(selectionPopulation)
+        levels = self._getRanking(selectionPopulation).getLevels()
         levelArr = []
         for level in levels:
             levelArr += level
 
-        survivorInds = levelArr[:poolSize]
-        for survivor in survivorInds:
-            survivors.append(selectionPopulation[survivor])
-
-        return survivors
+        return levelArr[:poolSize]
 
     def _proportionalSurvival(self, selectionPopulation, poolSize):
-        survivors = []
-        survivorIndices = []
         proportions = self._calcFitnessProportions(selectionPopulation)
-        totalProb = 0
-        for probability in proportions:
-            totalProb += probability
-
-        poolFull = False
-        while not poolFull:
-            place = 0
-            index = 0
-            randFloat = random.uniform(0, totalProb)
-            for prob in proportions:
-                if randFloat <= (place + prob):
-                    if index not in survivorIndices:
-                        survivorIndices.append(index)
-                        if len(survivorIndices) == poolSize:
-                            poolFull = True
-                            break
-                    else:
-                        break
-                else:
-                    place += prob
-                    index += 1
-        for survivor in survivorIndices:
-            survivors.append(selectionPopulation[survivor])
-        return survivors
+        return sampleWithoutReplacement(proportions, poolSize)
 
     def _tournamentSurvival(self, selectionPopulation, poolSize):
-        survivorIndices = []
+        # Each winner leaves the pool, and the ranking is updated in place rather
+        # than re-sorting the remaining pool for every tournament.
         survivors = []
-        remaining = selectionPopulation.copy()
+        ranking = ParetoRanking(selectionPopulation)
+        remaining = list(range(len(selectionPopulation)))
         for survivor in range(poolSize):
-            winner = self._kTournament(remaining.copy(), self.configDict["survivalTournament"])
-            survivors.append(remaining.copy()[winner])
+            winner = self._kTournament(remaining, ranking.ranks, self.configDict["survivalTournament"])
+            survivors.append(remaining[winner])
+            ranking.remove(remaining[winner])
             del remaining[winner]
 
         return survivors
 
     def _willTerminate(self):
-        if self.evalsLeft == 0:
-            return True
-        elif self.configDict["termination"] == "no-change-in-front" and \
+        return self.evalsLeft == 0 or self.limitReached()
+
+    def limitReached(self):
+        # Whether the run should stop before its evaluations are spent, checked
+        # once per generation: the front stopped changing or the time is up.
+        termination = self.configDict["termination"]
+        if termination in ("no-change-in-front", "combined") and \
                 self.solutionTracker.frontNoChange(self.configDict["frontNoChangeGens"]):
             return True
-        else:
-            return False
+        return self.deadline is not None and time.perf_counter() >= self.deadline
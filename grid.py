@@ -0,0 +1,134 @@
+# Occupancy of a sheet stored as a flat bytearray of length * width cells,
+# where cell (x, y) lives at index x * width + y. The indices of the cells
+# that have been filled are remembered so the grid can be cleared without
+# touching the empty part of the sheet.
+class OccupancyGrid:
+    def __init__(self, length, width):
+        self.length = length
+        self.width = width
+        self.cells = bytearray(length * width)
+        self.filled = []
+
+    def fits(self, template, coords):
+        bounds = template.bounds[coords[2]]
+        if coords[0] + bounds[0] < 0 or coords[0] + bounds[1] > self.length - 1:
+            return False
+        if coords[1] + bounds[2] < 0 or coords[1] + bounds[3] > self.width - 1:
+            return False
+
+        cells = self.cells
+        anchor = coords[0] * self.width + coords[1]
+        for offset in template.getLinearOffsets(self.width)[coords[2]]:
+            if cells[anchor + offset]:
+                return False
+        return True
+
+    def place(self, template, coords):
+        cells = self.cells
+        anchor = coords[0] * self.width + coords[1]
+        indices = [anchor + offset for offset in template.getLinearOffsets(self.width)[coords[2]]]
+        for index in indices:
+            cells[index] = 1
+        self.filled += indices
+
+    def clear(self):
+        cells = self.cells
+        for index in self.filled:
+            cells[index] = 0
+        self.filled = []
+
+
+# Every anchor at which a shape template can still be placed on a grid, for
+# all four rotations. An anchor is blocked when some filled cell lies under
+# one of the template's offsets from it, so the blocked anchors are found from
+# the filled cells alone and the free ones are never enumerated. Sampling
+# picks uniformly among the free [x, y, rotation] placements, the same
+# distribution that rejection sampling over the whole sheet converges to.
+class AnchorIndex:
+    def __init__(self, grid, template):
+        self.ranges = []
+        self.blocked = []
+        self.counts = []
+        for rotation in range(4):
+            bounds = template.bounds[rotation]
+            xRange = (-bounds[0], grid.length - 1 - bounds[1])
+            yRange = (-bounds[2], grid.width - 1 - bounds[3])
+            rangeWidth = yRange[1] - yRange[0] + 1
+            if xRange[1] < xRange[0] or rangeWidth <= 0:
+                self.ranges.append((xRange, yRange, 0))
+                self.blocked.append([])
+                self.counts.append(0)
+                continue
+
+            blocked = set()
+            for cell in grid.filled:
+                cellX, cellY = divmod(cell, grid.width)
+                for offset in template.offsets[rotation]:
+                    anchorX = cellX - offset[0]
+                    anchorY = cellY - offset[1]
+                    if xRange[0] <= anchorX <= xRange[1] and yRange[0] <= anchorY <= yRange[1]:
+                        blocked.add((anchorX - xRange[0]) * rangeWidth + anchorY - yRange[0])
+
+            area = (xRange[1] - xRange[0] + 1) * rangeWidth
+            self.ranges.append((xRange, yRange, rangeWidth))
+            self.blocked.append(sorted(blocked))
+            self.counts.append(area - len(blocked))
+
+    def getFeasibleCount(self):
+        return sum(self.counts)
+
+    def sample(self, rng):
+        # Returns a uniformly chosen free placement, or None when the shape fits nowhere.
+        total = self.getFeasibleCount()
+        if total == 0:
+            return None
+
+        choice = rng.randint(0, total - 1)
+        rotation = 0
+        while choice >= self.counts[rotation]:
+            choice -= self.counts[rotation]
+            rotation += 1
+
+        # Step past the blocked anchors that come before the chosen free one.
+        position = choice
+        for blockedPosition in self.blocked[rotation]:
+            if blockedPosition > position:
+                break
+            position += 1
+
+        xRange, yRange, rangeWidth = self.ranges[rotation]
+        return [xRange[0] + position // rangeWidth, yRange[0] + position % rangeWidth, rotation]
+
+
+# Height of the stack in every column y of a sheet, as the lowest x above all
+# the shapes placed so far. Shapes are dropped onto the stack, so a placement
+# never needs an occupancy check, at the cost of never filling the holes left
+# under overhangs.
+class Skyline:
+    def __init__(self, width):
+        self.width = width
+        self.heights = [0] * width
+
+    def getLowestPlacement(self, template):
+        # Returns the [x, y, rotation] anchor that rests the shape lowest, taking
+        # the smallest y and then the first rotation on ties. Each candidate
+        # anchor costs one pass over the shape's columns.
+        heights = self.heights
+        best = None
+        for rotation in range(4):
+            bounds = template.bounds[rotation]
+            profile = template.getColumnProfiles()[rotation]
+            for y in range(-bounds[2], self.width - bounds[3]):
+                x = -bounds[0]
+                for column, low, high in profile:
+                    if heights[y + column] - low > x:
+                        x = heights[y + column] - low
+                if best is None or x < best[0] or (x == best[0] and y < best[1]):
+                    best = [x, y, rotation]
+        return best
+
+    def place(self, template, coords):
+        heights = self.heights
+        for column, low, high in template.getColumnProfiles()[coords[2]]:
+            if coords[0] + high + 1 > heights[coords[1] + column]:
+                heights[coords[1] + column] = coords[0] + high + 1
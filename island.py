@@ -0,0 +1,112 @@
+import random
+import time
+from multiprocessing import Process
+from multiprocessing import Queue
+from multiprocessing import Value
+from queue import Empty
+from evolution import EvolutionEngine
+from runner import GenerationRecorder
+from runner import getRunSeed
+from pareto import ParetoArchive
+from solution import packSolutions
+from solution import unpackSolutions
+
+
+# Fitness evaluations shared by all islands of a run. Islands claim them one
+# generation at a time, so the run spends fitness-evaluations in total however
+# the work ends up split between the islands.
+class EvaluationBudget:
+    def __init__(self, evals):
+        self.evalsLeft = Value('q', evals)
+
+    def claim(self, evals):
+        with self.evalsLeft.get_lock():
+            granted = min(evals, self.evalsLeft.value)
+            self.evalsLeft.value -= granted
+        return granted
+
+    def release(self, evals):
+        with self.evalsLeft.get_lock():
+            self.evalsLeft.value += evals
+
+
+def _evolveIsland(island, configDict, problemSpecs, run, budget, inbox, outbox, results):
+    # Evolves one island's population until the shared budget runs out. Every
+    # migration-interval generations the island's first front is sent to the
+    # next island in the ring and any individuals that have arrived from the
+    # previous one are taken in, without waiting for them.
+    random.seed(getRunSeed(configDict["rngSeed"], run) + ":" + str(island))
+    outbox.cancel_join_thread()
+    start = time.perf_counter()
+    islandConfig = dict(configDict)
+    islandConfig["numEvals"] = budget.claim(configDict["populationSize"])
+    recorder = GenerationRecorder()
+    evolutionEngine = EvolutionEngine(islandConfig, problemSpecs, recorder)
+    evalsClaimed = islandConfig["numEvals"]
+
+    generations = 0
+    migrationSeconds = 0
+    migrantsSent = 0
+    migrantsReceived = 0
+    while True:
+        granted = budget.claim(configDict["offspringCount"] - evolutionEngine.evalsLeft)
+        evolutionEngine.evalsLeft += granted
+        evalsClaimed += granted
+        if evolutionEngine.evalsLeft == 0:
+            break
+        evolutionEngine.evolveGeneration()
+        generations += 1
+        if evolutionEngine.limitReached():
+            break
+
+        if generations % configDict["migrationInterval"] == 0:
+            migrationStart = time.perf_counter()
+            front = evolutionEngine.getFront()
+            outbox.put(packSolutions(front))
+            migrantsSent += len(front)
+
+            immigrants = []
+            while True:
+                try:
+                    immigrants += unpackSolutions(inbox.get_nowait())
+                except Empty:
+                    break
+            evolutionEngine.addImmigrants(immigrants)
+            migrantsReceived += len(immigrants)
+            migrationSeconds += time.perf_counter() - migrationStart
+            evolutionEngine.metrics.stopTimer("migration", migrationStart)
+
+    # Unused evaluations go back to the islands that are still running.
+    budget.release(evolutionEngine.evalsLeft)
+    stats = (evalsClaimed - evolutionEngine.evalsLeft, generations, time.perf_counter() - start,
+             migrationSeconds, migrantsSent, migrantsReceived)
+    evolutionEngine.logCacheStats()
+    evolutionEngine.logRunMetrics()
+    results.put((island, recorder.records, packSolutions(evolutionEngine.solutionTracker.bestFront), stats))
+
+
+def executeIslandRun(configDict, problemSpecs, run):
+    # Returns the log records and statistics of every island, in island order,
+    # and the non-dominated front of all the islands' best fronts.
+    islandCount = configDict["islandCount"]
+    budget = EvaluationBudget(configDict["numEvals"])
+    inboxes = [Queue() for island in range(islandCount)]
+    results = Queue()
+    processes = []
+    for island in range(islandCount):
+        process = Process(target=_evolveIsland,
+                          args=(island, configDict, problemSpecs, run, budget, inboxes[island],
+                                inboxes[(island + 1) % islandCount], results))
+        process.start()
+        processes.append(process)
+
+    islandResults = [None] * islandCount
+    archive = ParetoArchive(configDict["archiveSize"])
+    for process in processes:
+        island, records, bestFront, stats = results.get()
+        islandResults[island] = (records, stats)
+        archive.insertAll(unpackSolutions(bestFront))
+    for process in processes:
+        process.join()
+
+    return islandResults, archive.getSolutions()
@@ -0,0 +1,263 @@
+import atexit
+import json
+import queue
+import threading
+from stats import createStatsWriter
+from stats import flushStatsWriter
+from stats import getStatsWriter
+from stats import resumeStatsWriter
+
+
+# Appends queued text to one log file from a background thread, in batches.
+# The writer wakes every flushInterval seconds, when enough records are
+# waiting, or when a flush is requested.
+class LogWriter(threading.Thread):
+    batchSize = 1000
+
+    def __init__(self, path, flushInterval):
+        super().__init__(daemon=True)
+        self.path = path
+        self.flushInterval = flushInterval
+        self.records = queue.Queue()
+        self.flushRequested = threading.Event()
+        self.start()
+
+    def run(self):
+        while True:
+            self.flushRequested.wait(self.flushInterval)
+            self.flushRequested.clear()
+            self._writeQueued()
+
+    def _writeQueued(self):
+        texts = []
+        while True:
+            try:
+                texts.append(self.records.get_nowait())
+            except queue.Empty:
+                break
+        if texts:
+            with open(self.path, 'a') as file:
+                file.write("".join(texts))
+        for text in texts:
+            self.records.task_done()
+
+    def write(self, text):
+        self.records.put(text)
+        if self.records.qsize() >= self.batchSize:
+            self.flushRequested.set()
+
+    def flush(self):
+        # Blocks until everything queued so far is in the file.
+        self.flushRequested.set()
+        self.records.join()
+
+
+# One writer per log file, shared by every Logger writing to it, so records
+# reach the file in the order they were logged.
+logWriters = {}
+
+
+def getLogWriter(path, flushInterval):
+    if path not in logWriters:
+        logWriters[path] = LogWriter(path, flushInterval)
+    return logWriters[path]
+
+
+@atexit.register
+def flushLogWriters():
+    for writer in logWriters.values():
+        writer.flush()
+
+
+class Logger:
+    def __init__(self, configDict):
+        self.configDict = configDict
+        # Buffered loggers hand their records to a background writer.
+        self.writer = None
+        if configDict["logBuffering"]:
+            self.writer = getLogWriter(configDict["logFilePath"], configDict["logFlushInterval"])
+
+    def _write(self, text):
+        if self.writer is not None:
+            self.writer.write(text)
+            return
+        with open(self.configDict["logFilePath"], 'a') as file:
+            file.write(text)
+
+    def flush(self):
+        if self.writer is not None:
+            self.writer.flush()
+        if self.configDict["statsFilePath"]:
+            flushStatsWriter(self.configDict["statsFilePath"])
+
+    def createLog(self):
+        # Starts a new log file with the experiment's settings.
+        header = "-----Experiment Information-----\n"
+        header += "Algorithm\n"
+        if self.configDict["algorithmType"] == "ea":
+            header += "|\tType: Evolutionary Algorithm\n"
+        else:
+            header += "|\tType: Random Search\n"
+        header += "File Paths\n"
+        header += "|\tProblem file: " + str(self.configDict["problemPath"]) + "\n"
+        header += "|\tConfiguration file: " + str(self.configDict["configPath"]) + "\n"
+        header += "|\tLog file: " + str(self.configDict["logFilePath"]) + "\n"
+        header += "|\tSolution file: " + str(self.configDict["solutionFilePath"]) + "\n"
+        header += "RNG\n"
+        header += "|\tType: " + str(self.configDict["rngType"]) + "\n"
+        header += "|\tSeed: " + str(self.configDict["rngSeed"]) + "\n"
+        header += "Experiment\n"
+        header += "|\tNumber of Runs: " + str(self.configDict["numRuns"]) + "\n"
+        header += "|\tNumber of Evaluations: " + str(self.configDict["numEvals"]) + "\n"
+        if self.configDict["algorithmType"] == "ea":
+            header += "EA Settings\n"
+            header += "|\tInitialization Strategy: " + str(self.configDict["initialization"]) + "\n"
+            header += "|\tInitial Population Seeding: " + str(self.configDict["populationSeeding"]) + "\n"
+            header += "|\tParent Selection: " + str(self.configDict["parentSelection"]) + "\n"
+            if self.configDict["parentSelection"] == "k-tournament":
+                header += "|\tParent K Tournament Size: " + str(self.configDict["parentTournament"]) + "\n"
+            header += "|\tSurvival Strategy: " + str(self.configDict["survivalStrategy"]) + "\n"
+            header += "|\tSurvival Selection: " + str(self.configDict["survivalSelection"]) + "\n"
+            if self.configDict["survivalSelection"] == "k-tournament":
+                header += "|\tSurvival K Tournament Size: " + str(self.configDict["survivalTournament"]) + "\n"
+            header += "|\tTermination Condition: " + str(self.configDict["termination"]) + "\n"
+            if self.configDict["termination"] in ("no-change-in-front", "combined"):
+                header += "|\tNo Change In Front Generations: " + str(self.configDict["frontNoChangeGens"]) + "\n"
+            if self.configDict["termination"] in ("wall-clock", "combined"):
+                header += "|\tTime Limit: " + str(self.configDict["timeLimit"]) + "s\n"
+            header += "|\tPopulation Size: " + str(self.configDict["populationSize"]) + "\n"
+            header += "|\tOffspring Count: " + str(self.configDict["offspringCount"]) + "\n"
+            header += "|\tNumber of Runs: " + str(self.configDict["numRuns"]) + "\n"
+            header += "|\tMutation Rate: " + str(self.configDict["mutationRate"]) + "\n"
+        header += "--------------------------------\n"
+        header += "\n"
+        header += "Result Log"
+
+        self.flush()
+        with open(self.configDict["logFilePath"], 'w') as file:
+            file.write(header)
+        if self.configDict["statsFilePath"]:
+            createStatsWriter(self.configDict["statsFilePath"])
+        if self.configDict["metricsFilePath"]:
+            open(self.configDict["metricsFilePath"], 'w').close()
+
+    def resumeLog(self, logOffset, statsRows, run):
+        # Drops everything logged after a checkpoint, so the resumed run logs
+        # its remaining generations as if it had never stopped.
+        self.flush()
+        with open(self.configDict["logFilePath"], 'r+') as file:
+            file.truncate(logOffset)
+        if self.configDict["statsFilePath"]:
+            resumeStatsWriter(self.configDict["statsFilePath"], statsRows).run = run
+
+    def getStatsRows(self):
+        # Rows written to the statistics file so far.
+        if not self.configDict["statsFilePath"]:
+            return 0
+        statsWriter = getStatsWriter(self.configDict["statsFilePath"])
+        statsWriter.flush()
+        return statsWriter.rows
+
+    def addRunHeader(self, run):
+        self._write("\n\nRun " + str(run))
+        if self.configDict["instrumentation"] and self.configDict["metricsFilePath"]:
+            self._writeMetricsRecord({"run": run})
+        if self.configDict["statsFilePath"]:
+            statsWriter = getStatsWriter(self.configDict["statsFilePath"])
+            statsWriter.flush()
+            statsWriter.run = run
+            statsWriter.island = 0
+
+    def addGeneration(self, evals, bestLength, avgLength, bestWidth, avgWidth):
+        # Columns: evaluations, average and best length fitness, average and best width fitness.
+        line = str(evals) + "\t" + str(round(avgLength, 2)) + "\t" + str(bestLength) + "\t" + \
+            str(round(avgWidth, 2)) + "\t" + str(bestWidth)
+        if self.configDict["verbose"]:
+            print(line)
+        self._write("\n" + line)
+        if self.configDict["statsFilePath"]:
+            getStatsWriter(self.configDict["statsFilePath"]).addGeneration(evals, bestLength, avgLength,
+                                                                           bestWidth, avgWidth)
+
+    def addIndividual(self, evals, fitness):
+        line = str(evals) + "\t" + str(fitness)
+        if self.configDict["verbose"]:
+            print(line)
+        self._write("\n" + line)
+
+    def logBestSolution(self, solutions):
+        # Writes the best front, or the best single solution found by random
+        # search, in the format read back by population seeding.
+        self.flush()
+        if solutions and not hasattr(solutions[0], "shapeCoords"):
+            genomes = [solutions]
+        else:
+            genomes = [solution.shapeCoords for solution in solutions]
+
+        with open(self.configDict["solutionFilePath"], 'w') as file:
+            file.write(str(len(genomes)) + "\n")
+            for genome in genomes:
+                for gene in genome:
+                    file.write(str(gene[0]) + "," + str(gene[1]) + "," + str(gene[2]) + "\n")
+                file.write("\n")
+
+    def addIslandHeader(self, island):
+        self._write("\nIsland " + str(island))
+        if self.configDict["instrumentation"] and self.configDict["metricsFilePath"]:
+            self._writeMetricsRecord({"island": island})
+        if self.configDict["statsFilePath"]:
+            getStatsWriter(self.configDict["statsFilePath"]).island = island
+
+    def addThroughput(self, evals, generations, seconds):
+        # Evaluations and generations per second of a run, for sizing budgets.
+        evalsPerSecond = evals / seconds if seconds > 0 else 0
+        generationsPerSecond = generations / seconds if seconds > 0 else 0
+        self._write("\n|\tThroughput: " + str(evals) + " evaluations and " + str(generations) + " generations in " +
+                    str(round(seconds, 2)) + "s, " + str(round(evalsPerSecond, 1)) + " evals/sec, " +
+                    str(round(generationsPerSecond, 2)) + " generations/sec")
+
+    def addCacheStats(self, hits, misses, evictions):
+        lookups = hits + misses
+        hitRate = 100 * hits / lookups if lookups > 0 else 0
+        self._write("\n|\tEvaluation cache: " + str(hits) + " hits, " + str(misses) + " misses (" +
+                    str(round(hitRate, 1)) + "% hit rate), " + str(evictions) + " evictions")
+
+    def addIslandSummary(self, island, evals, generations, seconds, migrationSeconds, migrantsSent,
+                         migrantsReceived):
+        # Throughput of one island and the share of its time spent migrating.
+        evalsPerSecond = evals / seconds if seconds > 0 else 0
+        generationsPerSecond = generations / seconds if seconds > 0 else 0
+        overhead = 100 * migrationSeconds / seconds if seconds > 0 else 0
+        self._write("\n|\tIsland " + str(island) + ": " + str(evals) + " evaluations in " +
+                    str(round(seconds, 2)) + "s, " + str(round(evalsPerSecond, 1)) + " evals/sec, " +
+                    str(round(generationsPerSecond, 2)) + " generations/sec, " +
+                    "migration " + str(round(migrationSeconds, 3)) + "s (" + str(round(overhead, 2)) + "%), " +
+                    str(migrantsSent) + " migrants sent, " + str(migrantsReceived) + " received")
+
+    def _writeMetricsRecord(self, record):
+        # The metrics file holds one JSON object per line.
+        with open(self.configDict["metricsFilePath"], 'a') as file:
+            file.write(json.dumps(record, sort_keys=True) + "\n")
+
+    def _formatMetrics(self, times, counts):
+        parts = [phase + " " + ("%.6f" % times[phase]) + "s" for phase in sorted(times)]
+        parts += [counter + " " + str(counts[counter]) for counter in sorted(counts)]
+        return ", ".join(parts)
+
+    def addMetrics(self, evals, times, counts):
+        # Time spent in each phase of a generation and its placement counters.
+        if self.configDict["metricsFilePath"]:
+            self._writeMetricsRecord({"evals": evals, "times": times, "counts": counts})
+        else:
+            self._write("\n|\tMetrics at " + str(evals) + " evaluations: " + self._formatMetrics(times, counts))
+
+    def addRunMetrics(self, times, counts):
+        # Totals of a run, with each phase's share of the instrumented time.
+        totalSeconds = sum(times.values())
+        if self.configDict["metricsFilePath"]:
+            self._writeMetricsRecord({"summary": True, "seconds": totalSeconds, "times": times, "counts": counts})
+            return
+        shares = [phase + " " + str(round(100 * times[phase] / totalSeconds, 1)) + "%"
+                  for phase in sorted(times)] if totalSeconds > 0 else []
+        self._write("\n|\tRun metrics: " + str(round(totalSeconds, 3)) + "s instrumented, " +
+                    self._formatMetrics(times, counts) + "\n|\tPhase shares: " + ", ".join(shares))
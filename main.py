@@ -1,56 +1,106 @@
+import os
+import random
 from setup import Setup
 from evolution import EvolutionEngine
 from log import Logger
-from solution import SolutionGenerator
-from solution import SolutionTracker
+from pareto import ParetoArchive
+from runner import executeRunsInParallel
+from runner import getCompletedEvals
+from runner import getRunSeed
+from runner import replayRecords
+from island import executeIslandRun
+from search import executeRandomSearch
+from checkpoint import Checkpointer
+from checkpoint import loadCheckpoint
 
 
 def ea(setup):
+    # Returns the number of evaluations completed since the experiment started
+    # or resumed, and the archive's solutions.
     logger = Logger(setup.configDict)
-    solutionTracker = SolutionTracker()
-    logger.createLog()
-    bestFoundFront = []
-    for run in range(setup.configDict["numRuns"]):
+    # Best solutions over all runs.
+    archive = ParetoArchive(setup.configDict["archiveSize"])
+    checkpoint = None
+    firstRun = 0
+    if setup.configDict["resume"]:
+        checkpoint = loadCheckpoint(setup.configDict["checkpointFilePath"], setup.configDict["archiveSize"])
+        logger.resumeLog(checkpoint["logOffset"], checkpoint["statsRows"], checkpoint["run"] + 1)
+        archive.insertAll(checkpoint["archive"])
+        firstRun = checkpoint["run"]
+    else:
+        logger.createLog()
+    # Island runs already use one process per island, and steady-state runs use
+    # the workers to build offspring, so their runs are not pooled on top.
+    poolRuns = setup.configDict["islandCount"] == 1 and setup.configDict["parallelWorkers"] > 1 and \
+        setup.configDict["survivalStrategy"] != "steady-state"
+    if poolRuns:
+        runResults = executeRunsInParallel(setup.configDict, setup.problemSpecs, setup.configDict["parallelWorkers"])
+    evals = 0
+    for run in range(firstRun, setup.configDict["numRuns"]):
         if setup.configDict["verbose"]:
             print("\n\n---------Run #" + str(run+1) + "------------")
-        logger.addRunHeader(run + 1)
-        evolutionEngine = EvolutionEngine(setup.configDict, setup.problemSpecs)
-        evolutionEngine.evolvePopulation()
-        result = evolutionEngine.solutionTracker.bestFront
-
-        if not bestFoundFront:
-            bestFoundFront = result
+        resumed = checkpoint is not None and run == checkpoint["run"]
+        if not resumed:
+            logger.addRunHeader(run + 1)
+        if setup.configDict["islandCount"] > 1:
+            islandResults, result = executeIslandRun(setup.configDict, setup.problemSpecs, run)
+            for island in range(len(islandResults)):
+                records, stats = islandResults[island]
+                logger.addIslandHeader(island + 1)
+                replayRecords(logger, records)
+                logger.addIslandSummary(island + 1, *stats)
+                evals += stats[0]
+        elif poolRuns:
+            records, result = next(runResults)
+            replayRecords(logger, records)
+            evals += getCompletedEvals(records)
         else:
-            proportions = solutionTracker.getFrontDominanceProportions(result, bestFoundFront)
-            if proportions[0] > proportions[1]:
-                bestFoundFront = result
+            checkpointer = None
+            if setup.configDict["checkpointInterval"] > 0:
+                checkpointer = Checkpointer(setup.configDict, logger, archive, run)
+            if resumed:
+                random.setstate(checkpoint["rngState"])
+                evolutionEngine = EvolutionEngine(setup.configDict, setup.problemSpecs, checkpoint=checkpoint)
+            else:
+                random.seed(getRunSeed(setup.configDict["rngSeed"], run))
+                evolutionEngine = EvolutionEngine(setup.configDict, setup.problemSpecs)
+            evolutionEngine.evolvePopulation(checkpointer)
+            result = evolutionEngine.solutionTracker.bestFront
+            evals += evolutionEngine.evalsCompleted
+
+        archive.insertAll(result)
 
-    logger.logBestSolution(bestFoundFront)
+    logger.logBestSolution(archive.getSolutions())
+    # A finished experiment has nothing left to resume.
+    if os.path.exists(setup.configDict["checkpointFilePath"]):
+        os.remove(setup.configDict["checkpointFilePath"])
+    return evals, archive.getSolutions()
 
 
 def randomSearch(setup):
+    # Returns the number of evaluations over all runs and the fittest solution,
+    # or None if no candidate fit on the sheet.
     logger = Logger(setup.configDict)
     logger.createLog()
     bestFoundFitness = 0
-    bestFoundSolution = []
+    bestFoundSolution = None
+    runResults = executeRandomSearch(setup.configDict, setup.problemSpecs, setup.configDict["parallelWorkers"])
     for run in range(setup.configDict["numRuns"]):
         bestRunFitness = 0
-        bestRunSolution = []
+        bestRunSolution = None
         logger.addRunHeader(run + 1)
-        solutionGen = SolutionGenerator(setup.problemSpecs)
-        for evals in range(setup.configDict["numEvals"]):
-            solution = solutionGen.getRandomSolution()
-            fitness = solutionGen.problemSpecs["maxSheetLength"] - solution.length
+        for evals, fitness, solution in next(runResults):
             if fitness > bestRunFitness:
                 logger.addIndividual(evals + 1, fitness)
                 bestRunFitness = fitness
-                bestRunSolution = solution.shapeCoords
+                bestRunSolution = solution
 
         if bestRunFitness > bestFoundFitness:
             bestFoundFitness = bestRunFitness
             bestFoundSolution = bestRunSolution
 
-    logger.logBestSolution(bestFoundSolution)
+    logger.logBestSolution(bestFoundSolution.shapeCoords if bestFoundSolution is not None else [])
+    return setup.configDict["numRuns"] * setup.configDict["numEvals"], bestFoundSolution
 
 
 def main():
@@ -0,0 +1,68 @@
+import time
+
+
+# Time spent in each phase of a run and counts of events such as placement
+# retries. Totals are kept for the current generation and folded into the run's
+# totals when the generation ends.
+class Metrics:
+    enabled = True
+
+    def __init__(self):
+        self.generationTimes = {}
+        self.generationCounts = {}
+        self.runTimes = {}
+        self.runCounts = {}
+
+    def startTimer(self):
+        return time.perf_counter()
+
+    def stopTimer(self, phase, start):
+        self.generationTimes[phase] = self.generationTimes.get(phase, 0.0) + time.perf_counter() - start
+
+    def count(self, counter, amount=1):
+        self.generationCounts[counter] = self.generationCounts.get(counter, 0) + amount
+
+    def endGeneration(self):
+        # Returns the generation's times and counts and starts a new generation.
+        times = self.generationTimes
+        counts = self.generationCounts
+        for phase in times:
+            self.runTimes[phase] = self.runTimes.get(phase, 0.0) + times[phase]
+        for counter in counts:
+            self.runCounts[counter] = self.runCounts.get(counter, 0) + counts[counter]
+        self.generationTimes = {}
+        self.generationCounts = {}
+        return times, counts
+
+    def endRun(self):
+        # Returns the run's times and counts, including an unfinished generation.
+        self.endGeneration()
+        times = self.runTimes
+        counts = self.runCounts
+        self.runTimes = {}
+        self.runCounts = {}
+        return times, counts
+
+
+# Stands in for Metrics when instrumentation is off, so the instrumented code
+# pays for a method call and nothing else.
+class NullMetrics:
+    enabled = False
+
+    def startTimer(self):
+        return 0
+
+    def stopTimer(self, phase, start):
+        pass
+
+    def count(self, counter, amount=1):
+        pass
+
+    def endGeneration(self):
+        return {}, {}
+
+    def endRun(self):
+        return {}, {}
+
+
+NULL_METRICS = NullMetrics()
@@ -0,0 +1,238 @@
+import bisect
+
+
+# Solutions are compared on two maximised objectives, lengthFitness and
+# widthFitness. A solution dominates another when it is at least as good in
+# both objectives and strictly better in one, so identical solutions never
+# dominate each other and always share a level.
+def dominates(solution, other):
+    if solution.lengthFitness < other.lengthFitness or solution.widthFitness < other.widthFitness:
+        return False
+    return solution.lengthFitness > other.lengthFitness or solution.widthFitness > other.widthFitness
+
+
+def getFitnessColumns(population):
+    # Both objectives of every member of a population, as two columns. A
+    # PopulationStore keeps them as columns already; a list of solutions is read
+    # once.
+    if hasattr(population, "lengthFitness"):
+        return population.lengthFitness, population.widthFitness
+    return ([solution.lengthFitness for solution in population],
+            [solution.widthFitness for solution in population])
+
+
+def sortLevels(population):
+    # Non-dominated sorting for two objectives in O(n log n). Solutions are
+    # visited by descending lengthFitness, so everything already placed is at
+    # least as long, and each level's most recently placed solution has the best
+    # widthFitness in that level. A solution therefore belongs to the first level
+    # whose last solution does not dominate it, which is found by binary search.
+    # Returns the levels as lists of population indices and the level of every
+    # index.
+    lengthFitness, widthFitness = getFitnessColumns(population)
+    order = sorted(range(len(lengthFitness)), key=lambda index: (-lengthFitness[index], -widthFitness[index]))
+    levels = []
+    ranks = [0] * len(lengthFitness)
+    for index in order:
+        low = 0
+        high = len(levels)
+        while low < high:
+            middle = (low + high) // 2
+            last = levels[middle][-1]
+            # The last solution is at least as long, so it dominates when it is
+            # at least as wide and the two differ.
+            if widthFitness[last] >= widthFitness[index] and \
+                    (lengthFitness[last] > lengthFitness[index] or widthFitness[last] > widthFitness[index]):
+                low = middle + 1
+            else:
+                high = middle
+        if low == len(levels):
+            levels.append([])
+        levels[low].append(index)
+        ranks[index] = low
+
+    for level in levels:
+        level.sort()
+    return levels, ranks
+
+
+# Pareto levels of a population that can drop individuals without being
+# re-sorted. Each level is kept as a list of (-lengthFitness, widthFitness,
+# index) keys in ascending order, so along a level lengthFitness falls while
+# widthFitness rises, and the members a solution dominates, or that are
+# dominated by anything at least as long as it, can be found by bisection.
+# The fitness of a PopulationStore is read from its columns, which the store
+# keeps up to date, so rows appended to it later can be inserted.
+class ParetoRanking:
+    def __init__(self, population):
+        self.lengthFitness, self.widthFitness = getFitnessColumns(population)
+        levels, self.ranks = sortLevels(population)
+        self.levelKeys = [sorted(self._getKey(index) for index in level) for level in levels]
+        self.levels = levels
+
+    def _getKey(self, index):
+        return (-self.lengthFitness[index], self.widthFitness[index], index)
+
+    def getLevels(self):
+        if self.levels is None:
+            self.levels = [sorted(key[2] for key in keys) for keys in self.levelKeys]
+        return self.levels
+
+    def remove(self, index):
+        # Removing a solution can only lift the solutions it dominated, and each
+        # of them by at most one level. Those that are no longer dominated by the
+        # level above move up, and in turn may free solutions further down.
+        level = self.ranks[index]
+        keys = self.levelKeys[level]
+        del keys[bisect.bisect_left(keys, self._getKey(index))]
+        self.ranks[index] = -1
+        self.levels = None
+
+        freed = [index]
+        while freed and level + 1 < len(self.levelKeys):
+            candidates = self._getDominatedKeys(self.levelKeys[level + 1], freed)
+            freed = [key[2] for key in candidates if not self._isDominatedByLevel(key, self.levelKeys[level])]
+            for freedIndex in freed:
+                key = self._getKey(freedIndex)
+                nextKeys = self.levelKeys[level + 1]
+                del nextKeys[bisect.bisect_left(nextKeys, key)]
+                bisect.insort(self.levelKeys[level], key)
+                self.ranks[freedIndex] = level
+            level += 1
+
+        while self.levelKeys and not self.levelKeys[-1]:
+            self.levelKeys.pop()
+
+    def insert(self, index):
+        # Adds the row at index, which must be new to the ranking. The solution
+        # joins the first level with no member dominating it, which is found by
+        # bisection because a solution dominated by some level is dominated by
+        # every level above it. The members it dominates there drop one level,
+        # pushing down the members they dominate, and so on.
+        key = self._getKey(index)
+        low = 0
+        high = len(self.levelKeys)
+        while low < high:
+            middle = (low + high) // 2
+            if self._isDominatedByLevel(key, self.levelKeys[middle]):
+                low = middle + 1
+            else:
+                high = middle
+        if index >= len(self.ranks):
+            self.ranks.extend([-1] * (index + 1 - len(self.ranks)))
+        self.levels = None
+
+        level = low
+        pushed = [index]
+        while pushed:
+            if level == len(self.levelKeys):
+                self.levelKeys.append([])
+            keys = self.levelKeys[level]
+            dominated = self._getDominatedKeys(keys, pushed)
+            for dominatedKey in dominated:
+                del keys[bisect.bisect_left(keys, dominatedKey)]
+            for pushedIndex in pushed:
+                bisect.insort(keys, self._getKey(pushedIndex))
+                self.ranks[pushedIndex] = level
+            pushed = [dominatedKey[2] for dominatedKey in dominated]
+            level += 1
+
+    def move(self, index, newIndex):
+        # Relabels a member as newIndex, before the population moves it there.
+        level = self.ranks[index]
+        keys = self.levelKeys[level]
+        key = self._getKey(index)
+        del keys[bisect.bisect_left(keys, key)]
+        bisect.insort(keys, key[:2] + (newIndex,))
+        self.ranks[newIndex] = level
+        self.ranks[index] = -1
+        self.levels = None
+
+    def _getDominatedKeys(self, keys, indices):
+        dominated = set()
+        for index in indices:
+            lengthFitness = self.lengthFitness[index]
+            widthFitness = self.widthFitness[index]
+            position = bisect.bisect_left(keys, (-lengthFitness,))
+            while position < len(keys) and keys[position][1] <= widthFitness:
+                if keys[position][:2] != (-lengthFitness, widthFitness):
+                    dominated.add(keys[position])
+                position += 1
+        return sorted(dominated)
+
+    def _isDominatedByLevel(self, key, keys):
+        # Among the members at least as long as the key, the last one is the widest.
+        position = bisect.bisect_right(keys, (key[0], float("inf")))
+        if position == 0:
+            return False
+        widest = keys[position - 1]
+        return widest[1] > key[1] or (widest[1] == key[1] and widest[0] < key[0])
+
+
+def getMostCrowded(lengthKeys, widths):
+    # Position of the member with the smallest crowding distance in a front
+    # given as ascending -lengthFitness and widthFitness values. The crowding
+    # distance of an interior member is the normalised sides of the box spanned
+    # by its two neighbours, and the two extremes are infinitely far from the
+    # rest, so a front without interior members gives its second, or only, one.
+    lengthRange = (lengthKeys[-1] - lengthKeys[0]) or 1
+    widthRange = (widths[-1] - widths[0]) or 1
+    mostCrowded = min(1, len(lengthKeys) - 1)
+    smallestDistance = float("inf")
+    for position in range(1, len(lengthKeys) - 1):
+        distance = (lengthKeys[position + 1] - lengthKeys[position - 1]) / lengthRange + \
+            (widths[position + 1] - widths[position - 1]) / widthRange
+        if distance < smallestDistance:
+            smallestDistance = distance
+            mostCrowded = position
+    return mostCrowded
+
+
+# Non-dominated solutions found so far, sorted by descending lengthFitness and
+# therefore by ascending widthFitness. Only one solution is kept per pair of
+# fitness values. Whether a new solution is dominated is decided by bisection,
+# and the solutions it dominates form one run directly after its position.
+# With a capacity, the archive evicts its most crowded interior member when it
+# overflows, so the two extremes are always kept.
+class ParetoArchive:
+    def __init__(self, capacity=0):
+        self.capacity = capacity
+        self.lengthKeys = []
+        self.widths = []
+        self.solutions = []
+
+    def __len__(self):
+        return len(self.solutions)
+
+    def insert(self, solution):
+        # Returns whether the archive changed.
+        lengthKey = -solution.lengthFitness
+        position = bisect.bisect_left(self.lengthKeys, lengthKey)
+        longer = bisect.bisect_right(self.lengthKeys, lengthKey, position)
+        if longer > 0 and self.widths[longer - 1] >= solution.widthFitness:
+            return False
+
+        dominatedEnd = bisect.bisect_right(self.widths, solution.widthFitness, position)
+        self.lengthKeys[position:dominatedEnd] = [lengthKey]
+        self.widths[position:dominatedEnd] = [solution.widthFitness]
+        self.solutions[position:dominatedEnd] = [solution]
+        if self.capacity and len(self.solutions) > self.capacity:
+            return self._evictMostCrowded() != position
+        return True
+
+    def insertAll(self, solutions):
+        changed = False
+        for solution in solutions:
+            changed = self.insert(solution) or changed
+        return changed
+
+    def getSolutions(self):
+        return list(self.solutions)
+
+    def _evictMostCrowded(self):
+        # Returns the evicted position.
+        evicted = getMostCrowded(self.lengthKeys, self.widths)
+        del self.lengthKeys[evicted]
+        del self.widths[evicted]
+        del self.solutions[evicted]
+        return evicted
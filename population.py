@@ -0,0 +1,111 @@
+from array import array
+from solution import Genome
+from solution import Solution
+
+
+# Column store of a population, and the population itself for the evolution
+# engine. Every genome lives in one contiguous integer array shaped
+# (individuals, numShapes, 3), so gene g of individual i starts at
+# (i * numShapes + g) * 3, and the objective values sit beside it in one array
+# per column. A row may also carry the extremes of its bounding box (see
+# dimensions.py), or None until they are needed. Rows are changed in place;
+# indexing a row returns a Solution copied out of the store.
+class PopulationStore:
+    def __init__(self, numShapes, solutions=()):
+        self.numShapes = numShapes
+        self.genomes = array('l')
+        self.lengths = array('l')
+        self.widths = array('l')
+        self.lengthFitness = array('l')
+        self.widthFitness = array('l')
+        self.extremes = []
+        for solution in solutions:
+            self.append(solution)
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def __getitem__(self, individual):
+        if individual < 0:
+            individual += len(self)
+        if not 0 <= individual < len(self):
+            raise IndexError("population index out of range")
+        start = individual * self.numShapes * 3
+        genome = Genome.fromValues(self.genomes[start:start + self.numShapes * 3])
+        solution = Solution(genome, self.lengths[individual], self.widths[individual])
+        solution.lengthFitness = self.lengthFitness[individual]
+        solution.widthFitness = self.widthFitness[individual]
+        return solution
+
+    def __iter__(self):
+        for individual in range(len(self)):
+            yield self[individual]
+
+    def append(self, solution, extremes=None):
+        self.genomes.fromlist(solution.shapeCoords.values.tolist())
+        self.extremes.append(extremes)
+        self.lengths.append(solution.length)
+        self.widths.append(solution.width)
+        self.lengthFitness.append(solution.lengthFitness)
+        self.widthFitness.append(solution.widthFitness)
+
+    def replace(self, individual, solution, extremes=None):
+        start = individual * self.numShapes * 3
+        self.genomes[start:start + self.numShapes * 3] = array('l', solution.shapeCoords.values)
+        self.lengths[individual] = solution.length
+        self.widths[individual] = solution.width
+        self.lengthFitness[individual] = solution.lengthFitness
+        self.widthFitness[individual] = solution.widthFitness
+        self.extremes[individual] = extremes
+
+    def keep(self, individuals):
+        # Keeps only the given rows, in the given order. The columns are
+        # refilled rather than replaced, so references to them stay valid.
+        geneLength = self.numShapes * 3
+        genomes = array('l')
+        for individual in individuals:
+            genomes.extend(self.genomes[individual * geneLength:(individual + 1) * geneLength])
+        self.genomes[:] = genomes
+        for column in (self.lengths, self.widths, self.lengthFitness, self.widthFitness):
+            column[:] = array('l', [column[individual] for individual in individuals])
+        self.extremes[:] = [self.extremes[individual] for individual in individuals]
+
+    def pop(self):
+        # Removes the last row and returns it as a Solution.
+        solution = self[-1]
+        del self.genomes[-self.numShapes * 3:]
+        for column in (self.lengths, self.widths, self.lengthFitness, self.widthFitness):
+            column.pop()
+        self.extremes.pop()
+        return solution
+
+    def getGene(self, individual, geneNum):
+        start = (individual * self.numShapes + geneNum) * 3
+        return self.genomes[start:start + 3].tolist()
+
+    def getGenome(self, individual):
+        start = individual * self.numShapes * 3
+        genome = self.genomes[start:start + self.numShapes * 3].tolist()
+        return [genome[gene:gene + 3] for gene in range(0, len(genome), 3)]
+
+    def crossover(self, parent1, parent2, mask):
+        # Uniform crossover of two individuals, taking gene g from parent2 when
+        # bit g of mask is set and from parent1 otherwise. Also returns the
+        # numbers of the genes that differ from parent1.
+        geneLength = self.numShapes * 3
+        genome = self.genomes[parent1 * geneLength:(parent1 + 1) * geneLength]
+        parent2Start = parent2 * geneLength
+        changedGenes = []
+        geneNum = 0
+        while mask:
+            if mask & 1:
+                start = geneNum * 3
+                gene = self.genomes[parent2Start + start:parent2Start + start + 3]
+                if gene != genome[start:start + 3]:
+                    genome[start:start + 3] = gene
+                    changedGenes.append(geneNum)
+            mask >>= 1
+            geneNum += 1
+
+        genome = genome.tolist()
+        return [genome[gene:gene + 3] for gene in range(0, len(genome), 3)], changedGenes
@@ -0,0 +1,145 @@
+import hashlib
+import os
+import struct
+from array import array
+from shapes import ShapeTemplate
+from shapes import compileShapes
+
+
+# Compiled problems are cached under the SHA-256 of the problem file, so an
+# edited problem never reuses a stale entry. An entry holds a header, the
+# problem's step lines, one per shape, then int32 arrays of the number of cells
+# of every shape rotation, the rotations' bounding boxes, their (x, y) offsets
+# and their offsets into a grid as wide as the sheet. The templates are built
+# straight from the arrays.
+PROBLEM_MAGIC = b"SPRB"
+PROBLEM_VERSION = 1
+PROBLEM_HEADER = struct.Struct("<4sBIIIII")
+
+
+def parseProblem(text):
+    # The first line holds the sheet width and the number of shapes, and every
+    # following line the steps of one shape.
+    problemData = text.replace("\r\n", "\n").split("\n")
+    if problemData and problemData[-1] == "":
+        problemData.pop()
+    problemInfo = problemData[0].split()
+    shapeInfo = [line.split() for line in problemData[1:]]
+    return {"shapeInfo": shapeInfo, "sheetWidth": int(problemInfo[0]), "numOfShapes": int(problemInfo[1])}
+
+
+def getMaxSheetLength(shapeTemplates):
+    # Laying every shape end to end along its largest side always fits.
+    length = 0
+    for template in shapeTemplates:
+        length += template.getLargestSide()
+    return length
+
+
+def compileProblem(problemSpecs):
+    # Adds the shape templates and the maximum sheet length to parsed problem specs.
+    problemSpecs["shapeTemplates"] = compileShapes(problemSpecs["shapeInfo"])
+    problemSpecs["maxSheetLength"] = getMaxSheetLength(problemSpecs["shapeTemplates"])
+    return problemSpecs
+
+
+def _packProblem(problemSpecs):
+    steps = "\n".join(" ".join(shape) for shape in problemSpecs["shapeInfo"]).encode()
+    steps += b"\0" * (-len(steps) % 4)
+    cellCounts = array('i')
+    bounds = array('i')
+    offsets = array('i')
+    linearOffsets = array('i')
+    for template in problemSpecs["shapeTemplates"]:
+        for rotation in range(4):
+            cellCounts.append(len(template.offsets[rotation]))
+            bounds.extend(template.bounds[rotation])
+            for offset in template.offsets[rotation]:
+                offsets.extend(offset)
+            linearOffsets.extend(template.getLinearOffsets(problemSpecs["sheetWidth"])[rotation])
+    header = PROBLEM_HEADER.pack(PROBLEM_MAGIC, PROBLEM_VERSION, problemSpecs["sheetWidth"],
+                                 problemSpecs["numOfShapes"], len(problemSpecs["shapeInfo"]),
+                                 problemSpecs["maxSheetLength"], len(steps))
+    return b"".join([header, steps, cellCounts.tobytes(), bounds.tobytes(), offsets.tobytes(),
+                     linearOffsets.tobytes()])
+
+
+def _readInts(data, offset, count):
+    values = array('i')
+    values.frombytes(data[offset:offset + count * values.itemsize])
+    return values.tolist()
+
+
+def _loadProblem(path):
+    # Returns the problem specs of a cache entry, or None if it is not a valid one.
+    with open(path, 'rb') as file:
+        data = file.read()
+    if len(data) < PROBLEM_HEADER.size:
+        return None
+    magic, version, sheetWidth, numOfShapes, numShapes, maxSheetLength, stepsLength = \
+        PROBLEM_HEADER.unpack_from(data)
+    if magic != PROBLEM_MAGIC or version != PROBLEM_VERSION:
+        return None
+    offset = PROBLEM_HEADER.size
+    steps = data[offset:offset + stepsLength].rstrip(b"\0").decode()
+    shapeInfo = [line.split() for line in steps.split("\n")] if numShapes else []
+    offset += stepsLength
+    cellCounts = _readInts(data, offset, numShapes * 4)
+    offset += numShapes * 16
+    bounds = _readInts(data, offset, numShapes * 16)
+    offset += numShapes * 64
+    totalCells = sum(cellCounts)
+    offsets = _readInts(data, offset, totalCells * 2)
+    offset += totalCells * 8
+    linearOffsets = _readInts(data, offset, totalCells)
+    if offset + totalCells * 4 != len(data):
+        return None
+
+    # Both offset arrays hold the rotations one after another; cellStart is
+    # where the current rotation's cells begin.
+    shapeTemplates = []
+    cellStart = 0
+    for shape in range(numShapes):
+        templateOffsets = []
+        templateLinearOffsets = []
+        templateBounds = []
+        for rotation in range(shape * 4, shape * 4 + 4):
+            cellEnd = cellStart + cellCounts[rotation]
+            xs = offsets[cellStart * 2:cellEnd * 2:2]
+            ys = offsets[cellStart * 2 + 1:cellEnd * 2:2]
+            templateOffsets.append(tuple(zip(xs, ys)))
+            templateLinearOffsets.append(tuple(linearOffsets[cellStart:cellEnd]))
+            templateBounds.append(tuple(bounds[rotation * 4:rotation * 4 + 4]))
+            cellStart = cellEnd
+        shapeTemplates.append(ShapeTemplate.fromCompiled(shapeInfo[shape], templateOffsets, templateBounds,
+                                                         {sheetWidth: templateLinearOffsets}))
+    return {"shapeInfo": shapeInfo, "sheetWidth": sheetWidth, "numOfShapes": numOfShapes,
+            "shapeTemplates": shapeTemplates, "maxSheetLength": maxSheetLength}
+
+
+def loadProblem(problemPath, cacheDirectory):
+    # Returns the compiled problem, from the cache when it holds this problem
+    # file's contents. Without a cache directory the problem is always compiled.
+    with open(problemPath, 'rb') as file:
+        content = file.read()
+    if not cacheDirectory:
+        return compileProblem(parseProblem(content.decode()))
+
+    entryPath = os.path.join(cacheDirectory, hashlib.sha256(content).hexdigest() + ".problem")
+    if os.path.exists(entryPath):
+        problemSpecs = _loadProblem(entryPath)
+        if problemSpecs is not None:
+            return problemSpecs
+
+    problemSpecs = compileProblem(parseProblem(content.decode()))
+    # Written beside the entry and moved into place, so concurrent processes
+    # never read a partial entry. A cache that cannot be written is skipped.
+    temporaryPath = entryPath + "." + str(os.getpid()) + ".tmp"
+    try:
+        os.makedirs(cacheDirectory, exist_ok=True)
+        with open(temporaryPath, 'wb') as file:
+            file.write(_packProblem(problemSpecs))
+        os.replace(temporaryPath, entryPath)
+    except OSError:
+        pass
+    return problemSpecs
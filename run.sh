@@ -7,5 +7,5 @@
 # compile the program
 
 # execute the program and pass arguments if they exist
-/linux_apps/python-3.6.1/bin/python3 main.py $1 $2 $3
+/linux_apps/python-3.6.1/bin/python3 main.py $1 $2 $3 $4
 
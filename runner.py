@@ -0,0 +1,66 @@
+import random
+from multiprocessing import Pool
+from evolution import EvolutionEngine
+
+
+# Stands in for the Logger of an EvolutionEngine running in a worker process.
+# It keeps the run's log records so the parent process can write them to the
+# log in run order.
+class GenerationRecorder:
+    def __init__(self):
+        self.records = []
+
+    def addGeneration(self, evals, bestLength, avgLength, bestWidth, avgWidth):
+        self.records.append(("addGeneration", (evals, bestLength, avgLength, bestWidth, avgWidth)))
+
+    def addMetrics(self, evals, times, counts):
+        self.records.append(("addMetrics", (evals, times, counts)))
+
+    def addRunMetrics(self, times, counts):
+        self.records.append(("addRunMetrics", (times, counts)))
+
+    def addThroughput(self, evals, generations, seconds):
+        self.records.append(("addThroughput", (evals, generations, seconds)))
+
+    def addCacheStats(self, hits, misses, evictions):
+        self.records.append(("addCacheStats", (hits, misses, evictions)))
+
+
+def replayRecords(logger, records):
+    for method, arguments in records:
+        getattr(logger, method)(*arguments)
+
+
+def getCompletedEvals(records):
+    # Evaluations of a run, taken from its last logged generation.
+    for method, arguments in reversed(records):
+        if method == "addGeneration":
+            return arguments[0]
+    return 0
+
+
+def getRunSeed(rngSeed, run):
+    # Each run gets its own seed so that it produces the same result whether it
+    # is executed serially or by any worker of a pool.
+    return str(rngSeed) + ":" + str(run)
+
+
+def executeRun(configDict, problemSpecs, run):
+    random.seed(getRunSeed(configDict["rngSeed"], run))
+    recorder = GenerationRecorder()
+    evolutionEngine = EvolutionEngine(configDict, problemSpecs, recorder)
+    front = evolutionEngine.evolvePopulation()
+    return recorder.records, front
+
+
+def _executeRunTask(task):
+    return executeRun(*task)
+
+
+def executeRunsInParallel(configDict, problemSpecs, workers):
+    # Yields (log records, best front) for every run in run order, while later
+    # runs are still being evolved by the pool.
+    tasks = [(configDict, problemSpecs, run) for run in range(configDict["numRuns"])]
+    with Pool(workers) as pool:
+        for result in pool.imap(_executeRunTask, tasks):
+            yield result
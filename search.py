@@ -0,0 +1,102 @@
+import random
+from multiprocessing import Pool
+from runner import getRunSeed
+from solution import SolutionGenerator
+
+
+# Evaluations are drawn in blocks of this many, and each block is seeded once
+# from the run seed and its number.
+SEARCH_BLOCK_SIZE = 500
+
+
+# Builds random search candidates for one process, reusing a single generator,
+# random number generator and occupancy grid for every evaluation.
+class RandomSearchWorker:
+    def __init__(self, configDict, problemSpecs):
+        self.configDict = configDict
+        self.rng = random.Random()
+        self.solutionGen = SolutionGenerator(problemSpecs, self.rng, configDict["dimensionMode"])
+        self.grid = self.solutionGen.getEmptyGrid()
+
+    def searchBlock(self, run, firstEval, lastEval, bestFitness):
+        # Returns (evaluation, fitness, solution) for every candidate of the
+        # block [firstEval, lastEval) that is fitter than bestFitness and than
+        # all earlier ones in the block. A candidate is abandoned as soon as it
+        # can no longer be such an improvement. That changes how many numbers it
+        # draws, so the candidates of a block depend only on its seed and the
+        # bestFitness it starts from, never on which worker searches it.
+        maxSheetLength = self.solutionGen.problemSpecs["maxSheetLength"]
+        runSeed = getRunSeed(self.configDict["rngSeed"], run)
+        self.rng.seed(runSeed + ":" + str(firstEval // SEARCH_BLOCK_SIZE))
+        improvements = []
+        for evaluation in range(firstEval, lastEval):
+            solution = self.solutionGen.getRandomSolution(self.grid, maxSheetLength - bestFitness)
+            if solution is None:
+                continue
+            fitness = maxSheetLength - solution.length
+            if fitness > bestFitness:
+                improvements.append((evaluation, fitness, solution))
+                bestFitness = fitness
+        return improvements
+
+
+_worker = None
+
+
+def _initializeWorker(configDict, problemSpecs):
+    global _worker
+    _worker = RandomSearchWorker(configDict, problemSpecs)
+
+
+def _searchBlockTask(task):
+    return _worker.searchBlock(*task)
+
+
+def getSearchWaves(numEvals):
+    # Groups a run's blocks into waves of 1, 1, 2, 4, 8, ... blocks. Every block
+    # of a wave starts from the best fitness found by the waves before it, so
+    # the blocks of a wave can be searched at the same time while pruning stays
+    # close to as tight as in one sequential pass.
+    blocks = [(first, min(first + SEARCH_BLOCK_SIZE, numEvals)) for first in range(0, numEvals, SEARCH_BLOCK_SIZE)]
+    waves = []
+    waveSize = 1
+    while blocks:
+        waves.append(blocks[:waveSize])
+        blocks = blocks[waveSize:]
+        if len(waves) > 1:
+            waveSize *= 2
+    return waves
+
+
+def executeRandomSearch(configDict, problemSpecs, workers):
+    # Yields, for every run in order, the candidates that improved on the
+    # fitness their block started from and on all earlier candidates of the
+    # block. Every improvement of the run as a whole is among them, in
+    # evaluation order. The waves of all runs are searched in step, and the
+    # same waves are used whatever the number of workers.
+    numRuns = configDict["numRuns"]
+    waves = getSearchWaves(configDict["numEvals"])
+    improvements = [[] for run in range(numRuns)]
+    bestFitness = [0] * numRuns
+    pool = None
+    if workers == 1:
+        _initializeWorker(configDict, problemSpecs)
+        mapTasks = map
+    else:
+        pool = Pool(workers, _initializeWorker, (configDict, problemSpecs))
+        mapTasks = pool.map
+
+    try:
+        for wave in waves:
+            tasks = [(run, first, last, bestFitness[run]) for run in range(numRuns) for first, last in wave]
+            for task, blockImprovements in zip(tasks, mapTasks(_searchBlockTask, tasks)):
+                improvements[task[0]] += blockImprovements
+            for run in range(numRuns):
+                if improvements[run]:
+                    bestFitness[run] = max(fitness for evaluation, fitness, solution in improvements[run])
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+    for run in range(numRuns):
+        yield improvements[run]
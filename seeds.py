@@ -0,0 +1,100 @@
+import struct
+import sys
+from array import array
+from solution import getGenomeTypecode
+
+
+# Seed files hold whole genomes, either in the text format written by
+# Logger.logBestSolution or in a binary format: a header with the value
+# typecode, the number of solutions and the number of shapes, then every
+# genome as a flat row of (x, y, rotation) values. Both are read one solution
+# at a time, so a seed file is never held in memory.
+SEED_MAGIC = b"SSED"
+SEED_HEADER = struct.Struct("<4scII")
+
+
+def readSeedGenomes(path, numShapes):
+    # Yields every genome in a seed file as a list of numShapes [x, y, rotation]
+    # genes. Reading stops early at a truncated solution.
+    try:
+        with open(path, 'rb') as file:
+            if file.read(len(SEED_MAGIC)) == SEED_MAGIC:
+                file.seek(0)
+                yield from _readBinaryGenomes(file, numShapes)
+                return
+    except FileNotFoundError:
+        print("Population seed file could not be opened.")
+        sys.exit()
+
+    with open(path, 'r') as file:
+        yield from _readTextGenomes(file, numShapes)
+
+
+def _readTextGenomes(file, numShapes):
+    # Blank lines between solutions are skipped.
+    numberOfSolutions = int(file.readline())
+    genome = []
+    solutionsRead = 0
+    for line in file:
+        if solutionsRead == numberOfSolutions:
+            return
+        line = line.strip()
+        if not line:
+            continue
+        genome.append([int(num) for num in line.split(",")])
+        if len(genome) == numShapes:
+            yield genome
+            genome = []
+            solutionsRead += 1
+
+
+def _readBinaryGenomes(file, numShapes):
+    header = file.read(SEED_HEADER.size)
+    if len(header) < SEED_HEADER.size:
+        return
+    magic, typecode, numberOfSolutions, seedShapes = SEED_HEADER.unpack(header)
+    if seedShapes != numShapes:
+        print("Population seed file does not match the problem's number of shapes.")
+        sys.exit()
+    rowSize = numShapes * 3 * array(typecode.decode()).itemsize
+    for solution in range(numberOfSolutions):
+        data = file.read(rowSize)
+        if len(data) < rowSize:
+            return
+        values = array(typecode.decode())
+        values.frombytes(data)
+        values = values.tolist()
+        yield [values[gene:gene + 3] for gene in range(0, len(values), 3)]
+
+
+def writeBinarySeeds(path, genomes):
+    # Writes genomes, given as sequences of (x, y, rotation) genes, in the
+    # binary seed format.
+    values = []
+    for genome in genomes:
+        for gene in genome:
+            values.extend(gene)
+    numShapes = len(genomes[0]) if genomes else 0
+    typecode = getGenomeTypecode(values)
+    with open(path, 'wb') as file:
+        file.write(SEED_HEADER.pack(SEED_MAGIC, typecode.encode(), len(genomes), numShapes))
+        file.write(array(typecode, values).tobytes())
+
+
+def main():
+    # Converts a text seed or solution file to the binary seed format.
+    if len(sys.argv) != 3:
+        print("Please use the format 'python seeds.py <text-seed-filepath> <binary-seed-filepath>'")
+        sys.exit()
+    with open(sys.argv[1], 'r') as file:
+        file.readline()
+        numShapes = 0
+        for line in file:
+            if not line.strip():
+                break
+            numShapes += 1
+    writeBinarySeeds(sys.argv[2], list(readSeedGenomes(sys.argv[1], numShapes)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import heapq
+import math
+import random
+from bisect import bisect_right
+from itertools import accumulate
+
+
+# Draws indices with probability proportional to their weights by bisecting
+# the weights' prefix sums, which costs O(n) to build and O(log n) per draw.
+# Indices with a weight of 0 are never drawn.
+class CumulativeSampler:
+    def __init__(self, weights):
+        self.prefixSums = list(accumulate(weights))
+        self.total = self.prefixSums[-1] if self.prefixSums else 0
+
+    def sample(self, rng=random):
+        # The product can round up to the total, so the last index is the limit.
+        return min(bisect_right(self.prefixSums, rng.random() * self.total), len(self.prefixSums) - 1)
+
+    def sampleDistinct(self, count, rng=random):
+        # Draws count different indices, redrawing repeats. This is the same as
+        # drawing without replacement, and cheap while count is small.
+        indices = []
+        while len(indices) < count:
+            index = self.sample(rng)
+            if index not in indices:
+                indices.append(index)
+        return indices
+
+
+def sampleWithoutReplacement(weights, count, rng=random):
+    # Exact weighted sampling without replacement (Efraimidis and Spirakis):
+    # every index gets the key u ** (1 / weight) for a uniform u, and the count
+    # largest keys, in order, are distributed like count successive weighted
+    # draws that remove each drawn index. Keys are compared as log(u) / weight,
+    # which does not underflow, and indices with a weight of 0 come last. The
+    # cost is O(n log count).
+    keys = [math.log(1.0 - rng.random()) / weight if weight > 0 else -math.inf for weight in weights]
+    return heapq.nlargest(count, range(len(weights)), key=keys.__getitem__)
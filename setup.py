@@ -2,26 +2,29 @@ import sys
 import json
 import random
 import time
+from problemcache import loadProblem
 
 
 # Gets the problem and configuration file paths, extracts the problem data
-# and experiment settings.
+# and experiment settings. The arguments default to the command line's.
 class Setup:
-    def __init__(self):
+    def __init__(self, arguments=None):
+        if arguments is None:
+            arguments = sys.argv[1:]
         self.configDict = {}
         self.problemSpecs = {}
         try:
-            self.configDict["problemPath"] = str(sys.argv[1])
-            self.configDict["configPath"] = str(sys.argv[2])
+            self.configDict["problemPath"] = str(arguments[0])
+            self.configDict["configPath"] = str(arguments[1])
         except IndexError:
             print("Please use the format ’./run.sh <problem1-filepath> <configurationfilepath>’")
             sys.exit()
 
         print("Running experiment...")
-        if len(sys.argv) == 4 and str(sys.argv[3]) == "output":
-            self.configDict["verbose"] = True
-        else:
-            self.configDict["verbose"] = False
+        # Optional arguments: "output" prints progress, "resume" continues the
+        # experiment from its last checkpoint.
+        self.configDict["verbose"] = "output" in arguments[2:]
+        self.configDict["resume"] = "resume" in arguments[2:]
 
         self._readJsonData()
         self._readProblem()
@@ -37,6 +40,14 @@ class Setup:
         self.configDict["numEvals"] = int(jsonData["experiment-settings"]["fitness-evaluations"])
         self.configDict["rngType"] = jsonData["experiment-settings"]["rng"]["type"]
         self.configDict["rngSeed"] = jsonData["experiment-settings"]["rng"]["seed"]
+        self.configDict["parallelWorkers"] = int(jsonData["experiment-settings"].get("parallel-workers", 1))
+        self.configDict["dimensionMode"] = jsonData["experiment-settings"].get("dimension-mode", "anchor")
+        self.configDict["logBuffering"] = jsonData["experiment-settings"].get("log-buffering", "false") == "true"
+        self.configDict["logFlushInterval"] = float(jsonData["experiment-settings"].get("log-flush-interval", 1))
+        self.configDict["checkpointInterval"] = int(jsonData["experiment-settings"].get("checkpoint-interval", 0))
+        self.configDict["instrumentation"] = jsonData["experiment-settings"].get("instrumentation", "false") == "true"
+        self.configDict["evaluationCacheSize"] = int(jsonData["experiment-settings"].get("evaluation-cache-size", 0))
+        self.configDict["countCacheHits"] = jsonData["experiment-settings"].get("count-cache-hits", "true") == "true"
 
         self.configDict["initialization"] = jsonData["ea-settings"]["initialization-strategy"]
         if jsonData["ea-settings"]["population-seeding"] == "true":
@@ -59,10 +70,27 @@ class Setup:
             jsonData["ea-settings"]["strategy-parameters"]["mutation-rate"])
         self.configDict["frontNoChangeGens"] = int(jsonData["ea-settings"]["strategy-parameters"][
                                        "no-change-in-front-generations"])
+        self.configDict["timeLimit"] = float(jsonData["ea-settings"]["strategy-parameters"].get(
+                                       "time-limit-seconds", 0))
+        self.configDict["islandCount"] = int(jsonData["ea-settings"]["strategy-parameters"].get(
+                                       "island-count", 1))
+        self.configDict["migrationInterval"] = int(jsonData["ea-settings"]["strategy-parameters"].get(
+                                       "migration-interval", 10))
+        self.configDict["archiveSize"] = int(jsonData["ea-settings"]["strategy-parameters"].get(
+                                       "archive-size", 0))
 
         self.configDict["solutionFilePath"] = jsonData["file-settings"]["solution-file-path"]
         self.configDict["logFilePath"] = jsonData["file-settings"]["log-file-path"]
         self.configDict["seedFilePath"] = jsonData["file-settings"]["population-seed-file-path"]
+        # Per-generation statistics are only stored in binary form when a path is given.
+        self.configDict["statsFilePath"] = jsonData["file-settings"].get("stats-file-path")
+        # Instrumentation goes to the log unless a metrics file is given.
+        self.configDict["metricsFilePath"] = jsonData["file-settings"].get("metrics-file-path")
+        self.configDict["checkpointFilePath"] = jsonData["file-settings"].get(
+            "checkpoint-file-path", self.configDict["logFilePath"] + ".checkpoint")
+        # Compiled problems are cached here; an empty path turns the cache off.
+        self.configDict["problemCacheDirectory"] = jsonData["file-settings"].get(
+            "problem-cache-directory", ".problem-cache")
 
     # Get information from configuration file in JSON format.
     def _getJson(self):
@@ -78,25 +106,14 @@ class Setup:
         return jsonData
 
     def _readProblem(self):
-        # Makes an array of the lines of the problem instance file.
+        # Reads the problem instance file and compiles its shapes, or loads both
+        # from the problem cache.
         try:
-            with open(self.configDict["problemPath"], 'r') as file:
-                problemData = []
-                for line in file:
-                    problemData.append(line.rstrip('\n'))
+            self.problemSpecs = loadProblem(self.configDict["problemPath"], self.configDict["problemCacheDirectory"])
         except FileNotFoundError:
             print("Problem file could not be opened.")
             sys.exit()
 
-        problemInfo = problemData[0].split()
-        del problemData[0]
-        for stepSet in range(len(problemData)):
-            problemData[stepSet] = problemData[stepSet].split()
-
-        self.problemSpecs["shapeInfo"] = problemData
-        self.problemSpecs["sheetWidth"] = int(problemInfo[0])
-        self.problemSpecs["numOfShapes"] = int(problemInfo[1])
-
     def _seedRNG(self):
         # Seeds the RNG based on user's settings.
         if self.configDict["rngType"] == "seed":
@@ -114,6 +131,28 @@ class Setup:
             print("Invalid algorithm type, please refer to README.")
             sys.exit()
 
+        if self.configDict["initialization"] != "uniform-random" and \
+                self.configDict["initialization"] != "bottom-left-fill":
+            print("Invalid initialization strategy, please refer to README.")
+            sys.exit()
+
+        # Steady-state survival replaces one member of the population's last level
+        # per offspring, so its survival selection is not used.
+        if self.configDict["survivalStrategy"] not in ("plus", "comma", "steady-state"):
+            print("Invalid survival strategy, please refer to README.")
+            sys.exit()
+
+        # Every run stops once its evaluations are spent. "wall-clock" also stops
+        # it after time-limit-seconds, and "combined" at whichever of the time
+        # limit and no-change-in-front comes first.
+        if self.configDict["termination"] not in ("evaluations", "no-change-in-front", "wall-clock", "combined"):
+            print("Invalid termination condition, please refer to README.")
+            sys.exit()
+
+        if self.configDict["termination"] in ("wall-clock", "combined") and self.configDict["timeLimit"] <= 0:
+            print("Invalid time limit.")
+            sys.exit()
+
         if self.configDict["numRuns"] <= 0:
             print("Invalid number of runs.")
             sys.exit()
@@ -121,3 +160,44 @@ class Setup:
         if self.configDict["numEvals"] <= 0:
             print("Invalid number of evaluations.")
             sys.exit()
+
+        if self.configDict["dimensionMode"] != "anchor" and self.configDict["dimensionMode"] != "occupied":
+            print("Invalid dimension mode, please refer to README.")
+            sys.exit()
+
+        if self.configDict["logFlushInterval"] <= 0:
+            print("Invalid log flush interval.")
+            sys.exit()
+
+        # A cache size of 0 turns the evaluation cache off.
+        if self.configDict["evaluationCacheSize"] < 0:
+            print("Invalid evaluation cache size.")
+            sys.exit()
+
+        if self.configDict["checkpointInterval"] < 0:
+            print("Invalid checkpoint interval.")
+            sys.exit()
+
+        # Checkpoints capture a single engine, so only serial EA runs have them.
+        if (self.configDict["checkpointInterval"] > 0 or self.configDict["resume"]) and \
+                (self.configDict["algorithmType"] != "ea" or self.configDict["parallelWorkers"] > 1 or
+                 self.configDict["islandCount"] > 1):
+            print("Checkpoints are only supported for serial EA runs.")
+            sys.exit()
+
+        if self.configDict["parallelWorkers"] <= 0:
+            print("Invalid number of parallel workers.")
+            sys.exit()
+
+        if self.configDict["islandCount"] <= 0 or self.configDict["migrationInterval"] <= 0:
+            print("Invalid island settings.")
+            sys.exit()
+
+        # An archive size of 0 leaves the archive unbounded.
+        if self.configDict["archiveSize"] < 0 or self.configDict["archiveSize"] == 1:
+            print("Invalid archive size, it must be 0 or at least 2.")
+            sys.exit()
+
+        if self.configDict["numEvals"] < self.configDict["islandCount"] * self.configDict["populationSize"]:
+            print("Not enough evaluations to initialize every island.")
+            sys.exit()
@@ -0,0 +1,124 @@
+# Maps each step direction to its counterpart after a 90 degree rotation.
+ROTATION_MAP = {
+    1: {
+        "R": "D",
+        "U": "R",
+        "L": "U",
+        "D": "L",
+    },
+    2: {
+        "R": "L",
+        "U": "D",
+        "L": "R",
+        "D": "U",
+    },
+    3: {
+        "R": "U",
+        "U": "L",
+        "L": "D",
+        "D": "R",
+    }
+}
+
+MOVE_DICT = {
+    "L": [-1, 0],
+    "R": [1, 0],
+    "U": [0, 1],
+    "D": [0, -1]
+}
+
+
+# Geometry of a single shape compiled from its step list once per problem.
+# For each of the four rotations it holds the cells the shape covers as
+# (x, y) offsets from its anchor, in the order the steps first visit them,
+# and the bounding box of those offsets as [minX, maxX, minY, maxY].
+class ShapeTemplate:
+    def __init__(self, steps):
+        self.steps = steps
+        self.offsets = []
+        self.bounds = []
+        self.linearOffsets = {}
+        self.columnProfiles = None
+        for rotation in range(4):
+            offsets = self._traceOffsets(rotateShape(steps, rotation))
+            self.offsets.append(offsets)
+            self.bounds.append(self._getBounds(offsets))
+
+    @classmethod
+    def fromCompiled(cls, steps, offsets, bounds, linearOffsets):
+        # Rebuilds a template from geometry compiled earlier, without tracing the steps.
+        template = cls.__new__(cls)
+        template.steps = steps
+        template.offsets = offsets
+        template.bounds = bounds
+        template.linearOffsets = linearOffsets
+        template.columnProfiles = None
+        return template
+
+    def _traceOffsets(self, steps):
+        position = [0, 0]
+        offsets = [(0, 0)]
+        visited = {(0, 0)}
+        for step in steps:
+            moveVect = MOVE_DICT[step[0]]
+            paces = int(step[1:])
+            for pace in range(paces):
+                position[0] += moveVect[0]
+                position[1] += moveVect[1]
+                offset = (position[0], position[1])
+                if offset not in visited:
+                    visited.add(offset)
+                    offsets.append(offset)
+        return tuple(offsets)
+
+    def _getBounds(self, offsets):
+        xOffsets = [offset[0] for offset in offsets]
+        yOffsets = [offset[1] for offset in offsets]
+        return (min(xOffsets), max(xOffsets), min(yOffsets), max(yOffsets))
+
+    def getLinearOffsets(self, width):
+        # Offsets of the covered cells into a flat grid that is width cells wide.
+        if width not in self.linearOffsets:
+            self.linearOffsets[width] = [tuple(offset[0] * width + offset[1] for offset in offsets)
+                                         for offsets in self.offsets]
+        return self.linearOffsets[width]
+
+    def getColumnProfiles(self):
+        # For each rotation, every column y the shape covers as (y, lowest x,
+        # highest x) offsets from its anchor. Shapes are connected, so the
+        # columns run without gaps from the lowest y to the highest.
+        if self.columnProfiles is None:
+            self.columnProfiles = []
+            for offsets in self.offsets:
+                columns = {}
+                for offset in offsets:
+                    low, high = columns.get(offset[1], (offset[0], offset[0]))
+                    columns[offset[1]] = (min(low, offset[0]), max(high, offset[0]))
+                self.columnProfiles.append(tuple((y,) + columns[y] for y in sorted(columns)))
+        return self.columnProfiles
+
+    def getLargestSide(self):
+        bounds = self.bounds[0]
+        horizontalLength = bounds[1] - bounds[0] + 1
+        verticalLength = bounds[3] - bounds[2] + 1
+        return max(horizontalLength, verticalLength)
+
+
+def rotateShape(shape, rotation):
+    # Map the shape's steps to their rotated counterparts
+    if rotation == 0:
+        return shape
+
+    # Change the direction char in the step according to the rotation
+    rotateDict = ROTATION_MAP[rotation]
+    rotatedStepList = []
+    for step in shape:
+        direction = step[0]
+        dirRotated = rotateDict[direction]
+        newStep = dirRotated + step[1:]
+        rotatedStepList.append(newStep)
+    return rotatedStepList
+
+
+def compileShapes(shapeInfo):
+    return [ShapeTemplate(shape) for shape in shapeInfo]
@@ -1,9 +1,132 @@
 import random
+import struct
 import sys
-
-
+from array import array
+from shapes import compileShapes
+from grid import OccupancyGrid
+from grid import AnchorIndex
+from grid import Skyline
+from pareto import sortLevels
+from pareto import getFitnessColumns
+from pareto import ParetoArchive
+from dimensions import getGeneExtent
+from metrics import NULL_METRICS
+from problemcache import getMaxSheetLength
+
+
+# Solutions are serialized as a small header, four integer columns (length,
+# width and the two fitness values) and one flat genome array, using 16 bit
+# genes whenever the coordinates fit in them.
+SOLUTION_HEADER = struct.Struct("<cII")
+
+
+def getGenomeTypecode(values):
+    # 16 bit genes unless some coordinate does not fit in them.
+    if values and (max(values) > 32767 or min(values) < -32768):
+        return 'i'
+    return 'h'
+
+
+def packSolutions(solutions):
+    numShapes = len(solutions[0].shapeCoords) if solutions else 0
+    columns = array('q')
+    for solution in solutions:
+        columns.extend((solution.length, solution.width, solution.lengthFitness, solution.widthFitness))
+
+    # Genomes that are already packed alike, in 16 or 32 bits, are copied as
+    # they are.
+    typecodes = set(solution.shapeCoords.values.typecode for solution in solutions)
+    if len(typecodes) == 1 and typecodes <= {'h', 'i'}:
+        typecode = typecodes.pop()
+        genomeBytes = b"".join(solution.shapeCoords.values.tobytes() for solution in solutions)
+    else:
+        genomes = []
+        for solution in solutions:
+            genomes += solution.shapeCoords.values.tolist()
+        typecode = getGenomeTypecode(genomes)
+        genomeBytes = array(typecode, genomes).tobytes()
+    header = SOLUTION_HEADER.pack(typecode.encode(), len(solutions), numShapes)
+    return header + columns.tobytes() + genomeBytes
+
+
+def unpackSolutions(data):
+    typecode, count, numShapes = SOLUTION_HEADER.unpack_from(data)
+    offset = SOLUTION_HEADER.size
+    columns = array('q')
+    columns.frombytes(data[offset:offset + count * 4 * columns.itemsize])
+    offset += count * 4 * columns.itemsize
+    genomes = array(typecode.decode())
+    genomes.frombytes(data[offset:])
+
+    solutions = []
+    for index in range(count):
+        start = index * numShapes * 3
+        shapeCoords = Genome.fromValues(genomes[start:start + numShapes * 3])
+        solution = Solution(shapeCoords, columns[index * 4], columns[index * 4 + 1])
+        solution.lengthFitness = columns[index * 4 + 2]
+        solution.widthFitness = columns[index * 4 + 3]
+        solutions.append(solution)
+    return solutions
+
+
+# Genome of a solution packed into one flat array of (x, y, rotation) values.
+# It reads like a sequence of genes, each returned as a tuple, slices are
+# genomes too, and two genomes are equal when their genes are. It is never
+# modified once built, so copies of a solution can share it.
+class Genome:
+    __slots__ = ("values",)
+
+    def __init__(self, genes=()):
+        values = []
+        for gene in genes:
+            values.extend(gene)
+        self.values = array(getGenomeTypecode(values), values)
+
+    @classmethod
+    def fromValues(cls, values):
+        genome = cls.__new__(cls)
+        genome.values = values
+        return genome
+
+    def __len__(self):
+        return len(self.values) // 3
+
+    def __getitem__(self, geneNum):
+        if isinstance(geneNum, slice):
+            start, stop, step = geneNum.indices(len(self))
+            if step == 1:
+                return Genome.fromValues(self.values[start * 3:max(start, stop) * 3])
+            return Genome(self[gene] for gene in range(start, stop, step))
+        if geneNum < 0:
+            geneNum += len(self)
+        if geneNum < 0 or geneNum >= len(self):
+            raise IndexError("gene index out of range")
+        return tuple(self.values[geneNum * 3:geneNum * 3 + 3])
+
+    def __iter__(self):
+        values = iter(self.values)
+        return zip(values, values, values)
+
+    def __eq__(self, other):
+        if not isinstance(other, Genome):
+            return NotImplemented
+        return self.values == other.values
+
+    def __hash__(self):
+        return hash(tuple(self.values))
+
+    def tolist(self):
+        return [list(gene) for gene in self]
+
+
+# Solutions only carry their genome and objective values, so they are slotted
+# to keep large populations small.
 class Solution:
+    __slots__ = ("shapeCoords", "length", "width", "lengthFitness", "widthFitness")
+
     def __init__(self, shapeCoords, length, width):
+        if not isinstance(shapeCoords, Genome):
+            shapeCoords = Genome(shapeCoords)
         self.shapeCoords = shapeCoords
         self.length = length
         self.width = width
@@ -11,62 +134,50 @@ class Solution:
         self.widthFitness = 0
 
 
+# Metric counters of the random placements made by each caller: placements,
+# rejected samples and fallbacks to the anchor index.
+RANDOM_SOLUTION_COUNTERS = ("getRandomSolution placements", "getRandomSolution retries",
+                            "getRandomSolution index fallbacks")
+ADD_GENE_COUNTERS = ("addNewGene placements", "addNewGene retries", "addNewGene index fallbacks")
+
+
+ROTATIONS = (0, 1, 2, 3)
+
+
 class SolutionGenerator:
-    def __init__(self, problemSpecs):
+    minPlacementRetries = 16
+
+    def __init__(self, problemSpecs, rng=None, dimensionMode="anchor", metrics=NULL_METRICS):
         self.problemSpecs = problemSpecs
-        self.problemSpecs["maxSheetLength"] = self._calcMaxSheetLength()
-
-    def _calcMaxSheetLength(self):
-        length = 0
-        for shape in self.problemSpecs["shapeInfo"]:
-            length += self._getShapeLargestSide(shape)
-        return length
-
-    def _getShapeLargestSide(self, shape):
-        vertices = self._getShapeVertices(shape)
-        horizontalLength = abs(vertices[0][0] - vertices[1][0]) + 1
-        verticalLength = abs(vertices[0][1] - vertices[2][1]) + 1
-
-        return max(horizontalLength, verticalLength)
-
-    def _getShapeVertices(self, shape):
-        # Find the vertices of the smallest rectangle that can enclose the shape.
-        vertices = [[0, 0], [0, 0], [0, 0], [0, 0]]
-        currPos = [0, 0]
-        for step in shape:
-            direction = step[0]
-            paces = int(step[1:])
-
-            if direction == "D":
-                currPos[1] -= paces
-                if currPos[1] < vertices[2][1]:
-                    vertices[2][1] = currPos[1]
-                    vertices[3][1] = currPos[1]
-            elif direction == "R":
-                currPos[0] += paces
-                if currPos[0] > vertices[1][0]:
-                    vertices[1][0] = currPos[0]
-                    vertices[3][0] = currPos[0]
-            elif direction == "U":
-                currPos[1] += paces
-                if currPos[1] > vertices[0][1]:
-                    vertices[0][1] = currPos[1]
-                    vertices[1][1] = currPos[1]
-            elif direction == "L":
-                currPos[0] -= paces
-                if currPos[0] < vertices[0][0]:
-                    vertices[0][0] = currPos[0]
-                    vertices[2][0] = currPos[0]
-        return vertices
-
-    def getRandomSolution(self):
-        grid = [[0] * self.problemSpecs["sheetWidth"] for i in range(self.problemSpecs["maxSheetLength"])]
+        self.metrics = metrics
+        # Sheet dimensions span the shapes' anchors, or every occupied cell in
+        # the "occupied" mode.
+        self.occupiedDimensions = dimensionMode == "occupied"
+        # Any object with the random module's interface; the module itself by default.
+        if rng is None:
+            rng = random
+        self.rng = rng
+        if "shapeTemplates" not in self.problemSpecs:
+            self.problemSpecs["shapeTemplates"] = compileShapes(self.problemSpecs["shapeInfo"])
+        self.shapeTemplates = self.problemSpecs["shapeTemplates"]
+        if "maxSheetLength" not in self.problemSpecs:
+            self.problemSpecs["maxSheetLength"] = getMaxSheetLength(self.shapeTemplates)
+
+    def getRandomSolution(self, grid=None, lengthLimit=None):
+        # A grid passed in is cleared and reused instead of allocating a new one.
+        # With a lengthLimit, construction stops and None is returned as soon as
+        # an anchor makes the sheet at least that long.
+        if grid is None:
+            grid = self.getEmptyGrid()
+        else:
+            grid.clear()
         coordList = []
-        for shape in self.problemSpecs["shapeInfo"]:
-            coords = self._getRandomCoordsConstrained()
-            while not self._coordsAreValid(grid, shape, coords):
-                coords = self._getRandomCoordsConstrained()
-            grid = self._addShapeToGrid(shape, grid, coords)
+        for template in self.shapeTemplates:
+            coords = self._getRandomPlacement(grid, template, RANDOM_SOLUTION_COUNTERS)
+            if lengthLimit is not None and \
+                    getGeneExtent(template, coords, self.occupiedDimensions)[1] + 1 >= lengthLimit:
+                return None
+            grid = self._addShapeToGrid(template, grid, coords)
 
             coordList.append(coords)
         dimensions = self.getSheetDimensionsConstrained(coordList)
@@ -77,188 +188,146 @@ class SolutionGenerator:
         solution.widthFitness = self.problemSpecs["sheetWidth"] - width
         return solution
 
+    def getBottomLeftSolution(self):
+        # Drops the shapes one by one, in random order, onto a skyline across
+        # the sheet's width, each at its lowest resting anchor. The stack is at
+        # most as long as the shapes laid end to end, so it always fits the sheet.
+        order = list(range(len(self.shapeTemplates)))
+        self.rng.shuffle(order)
+        skyline = Skyline(self.problemSpecs["sheetWidth"])
+        coordList = [None] * len(order)
+        for shape in order:
+            template = self.shapeTemplates[shape]
+            coords = skyline.getLowestPlacement(template)
+            skyline.place(template, coords)
+            coordList[shape] = coords
+        self.metrics.count("getBottomLeftSolution placements", len(order))
+        dimensions = self.getSheetDimensionsConstrained(coordList)
+        length = dimensions[1] + 1
+        width = dimensions[3] + 1
+        solution = Solution(coordList, length, width)
+        solution.lengthFitness = self.problemSpecs["maxSheetLength"] - length
+        solution.widthFitness = self.problemSpecs["sheetWidth"] - width
+        return solution
+
+    def getEmptyGrid(self):
+        return OccupancyGrid(self.problemSpecs["maxSheetLength"], self.problemSpecs["sheetWidth"])
+
     def _getRandomCoordsConstrained(self):
         coords = []
-        coords.append(random.randint(0, self.problemSpecs["maxSheetLength"] - 1))
-        coords.append(random.randint(0, self.problemSpecs["sheetWidth"] - 1))
-        coords.append(random.randint(0, 3))
+        coords.append(self.rng.randint(0, self.problemSpecs["maxSheetLength"] - 1))
+        coords.append(self.rng.randint(0, self.problemSpecs["sheetWidth"] - 1))
+        coords.append(self.rng.randint(0, 3))
         return coords
 
-    def _coordsAreValid(self, grid, shape, coords):
-        position = [coords[0], coords[1]]
-        if grid[position[0]][position[1]] == 1:
-            return False
-
-        moveDict = {
-            "L": [-1, 0],
-            "R": [1, 0],
-            "U": [0, 1],
-            "D": [0, -1]
-        }
-        rotatedShape = self._rotateShape(shape, coords[2])
-        for step in rotatedShape:
-            moveVect = moveDict[step[0]]
-            paces = int(step[1:])
-            for pace in range(paces):
-                position[0] += moveVect[0]
-                position[1] += moveVect[1]
-                if position[0] > len(grid) - 1 or position[0] < 0:
-                    return False
-                if position[1] > len(grid[0]) - 1 or position[1] < 0:
-                    return False
-                if grid[position[0]][position[1]] == 1:
-                    return False
-
-        return True
+    def _getRandomPlacement(self, grid, template, counters):
+        # Rejection sampling is cheapest while the sheet is sparse. Once it has
+        # cost about as much as building the template's anchor index would,
+        # sample straight from the index instead, so a crowded sheet can never
+        # make the retries run away. Retries and index fallbacks are counted
+        # under the caller's counters.
+        self.metrics.count(counters[0])
+        retryBudget = max(self.minPlacementRetries, len(grid.filled) * len(template.offsets[0]) // 8)
+        for attempt in range(retryBudget):
+            coords = self._getRandomCoordsConstrained()
+            if self._coordsAreValid(grid, template, coords):
+                self.metrics.count(counters[1], attempt)
+                return coords
+
+        self.metrics.count(counters[1], retryBudget)
+        self.metrics.count(counters[2])
+        coords = AnchorIndex(grid, template).sample(self.rng)
+        if coords is None:
+            print("A shape could not be placed anywhere on the sheet.")
+            sys.exit()
+        return coords
 
-    def _rotateShape(self, shape, rotation):
-        # Map the shape's steps to their rotated counterparts
-        if rotation == 0:
-            return shape
-
-        # Create the mapping from normal orientation to each 90 degree rotation.
-        rotationMap = {}
-        rotationMap[1] = {
-            "R": "D",
-            "U": "R",
-            "L": "U",
-            "D": "L",
-        }
-        rotationMap[2] = {
-            "R": "L",
-            "U": "D",
-            "L": "R",
-            "D": "U",
-        }
-        rotationMap[3] = {
-            "R": "U",
-            "U": "L",
-            "L": "D",
-            "D": "R",
-        }
-
-        # Change the direction char in the step according to the rotation
-        rotateDict = rotationMap[rotation]
-        rotatedStepList = []
-        for step in shape:
-            direction = step[0]
-            dirRotated = rotateDict[direction]
-            newStep = dirRotated + step[1:]
-            rotatedStepList.append(newStep)
-        return rotatedStepList
-
-    def _addShapeToGrid(self, shape, grid, coords):
-        position = [coords[0], coords[1]]
-        grid[position[0]][position[1]] = 1
-        moveDict = {
-            "L": [-1, 0],
-            "R": [1, 0],
-            "U": [0, 1],
-            "D": [0, -1]
-        }
-        rotatedShape = self._rotateShape(shape, coords[2])
-        for step in rotatedShape:
-            moveVect = moveDict[step[0]]
-            paces = int(step[1:])
-            for pace in range(paces):
-                position[0] += moveVect[0]
-                position[1] += moveVect[1]
-                grid[position[0]][position[1]] = 1
+    def _coordsAreValid(self, grid, template, coords):
+        return grid.fits(template, coords)
 
+    def _addShapeToGrid(self, template, grid, coords):
+        grid.place(template, coords)
         return grid
 
-    def _drawShape(self, shape, coords):
-        squareList = []
-        position = [coords[0], coords[1]]
-        squareList.append(position.copy())
-        moveDict = {
-            "L": [-1, 0],
-            "R": [1, 0],
-            "U": [0, 1],
-            "D": [0, -1]
-        }
-        rotatedShape = self._rotateShape(shape, coords[2])
-        for step in rotatedShape:
-            moveVect = moveDict[step[0]]
-            paces = int(step[1:])
-            for pace in range(paces):
-                position[0] += moveVect[0]
-                position[1] += moveVect[1]
-                squareList.append(position.copy())
-        return squareList
-
-    def addMutations(self, solution):
+    def repairSolution(self, solution, changedGenes=None):
+        # Places every gene in order, keeping genes that fit among the ones
+        # already placed and drawing a random placement for cleared or
+        # overlapping genes. The numbers of the genes that had to be placed anew
+        # are appended to changedGenes when it is given.
         validSolution = []
+        grid = self.getEmptyGrid()
         for geneNum in range(len(solution)):
-            validSolution = self.addNewGene(geneNum, solution[geneNum], validSolution.copy())
+            # The gene is read once, since a packed genome builds a new tuple on
+            # every read, and addNewGene keeps that same object if it fits.
+            gene = solution[geneNum]
+            validSolution = self.addNewGene(geneNum, gene, validSolution, grid)
+            if changedGenes is not None and validSolution[-1] is not gene:
+                changedGenes.append(geneNum)
 
         return validSolution
 
-    def addNewGene(self, shapeNum, gene, solution):
-        gene = [0, 0, 0]
-        if not gene:
-            gene = self._getRandomCoordsConstrained()
-
-        grid = []
-        for shape in range(len(solution)):
-            squares = self._drawShape(self.problemSpecs["shapeInfo"][shape], solution[shape])
-            grid += squares
-
-        geneFound = False
-        while not geneFound:
-            checkSquares = self._drawShape(self.problemSpecs["shapeInfo"][shapeNum], gene)
-            invalid = False
-            for square in checkSquares:
-                yOutOfBounds = (square[0] < 0) or (square[0] > self.problemSpecs["maxSheetLength"] - 1)
-                xOutOfBounds = (square[1] < 0) or (square[1] > self.problemSpecs["sheetWidth"] - 1)
-                if square in grid or xOutOfBounds or yOutOfBounds:
-                    invalid = True
-                    break
-            if not invalid:
-                geneFound = True
-            else:
-                gene = self._getRandomCoordsConstrained()
+    def addNewGene(self, shapeNum, gene, solution, grid=None):
+        # Genes are placed against an occupancy grid holding the shapes already in
+        # the solution. Callers building a whole solution pass the same grid for
+        # every gene so it is only ever updated, never rebuilt.
+        if grid is None:
+            grid = self.getEmptyGrid()
+            for shape in range(len(solution)):
+                grid.place(self.shapeTemplates[shape], solution[shape])
 
+        template = self.shapeTemplates[shapeNum]
+        if not gene or not grid.fits(template, gene):
+            gene = self._getRandomPlacement(grid, template, ADD_GENE_COUNTERS)
+
+        grid.place(template, gene)
         solution.append(gene)
         return solution
 
-    def solutionIsValid(self, solution):
-        squares = []
+    def solutionIsValid(self, solution, grid=None):
+        # Every shape must lie on the sheet without overlapping the shapes before
+        # it, which the occupancy grid checks in time linear in the shapes' cells.
+        if grid is None:
+            grid = self.getEmptyGrid()
+        else:
+            grid.clear()
         for coord in range(len(solution)):
-            checkSquares = self._drawShape(self.problemSpecs["shapeInfo"][coord], solution[coord])
-            for square in checkSquares:
-                yOutOfBounds = (square[0] < 0) or (square[0] > self.problemSpecs["maxSheetLength"] - 1)
-                xOutOfBounds = (square[1] < 0) or (square[1] > self.problemSpecs["sheetWidth"] - 1)
-                if square in squares or xOutOfBounds or yOutOfBounds:
-                    print("Seeded solution was invalid, discarding...")
-                    return False
-            squares += checkSquares
+            gene = solution[coord]
+            if len(gene) != 3 or gene[2] not in ROTATIONS or not grid.fits(self.shapeTemplates[coord], gene):
+                print("Seeded solution was invalid, discarding...")
+                return False
+            grid.place(self.shapeTemplates[coord], gene)
         return True
 
     def getSheetDimensionsConstrained(self, solution):
-        filledSquares = []
-        for coord in range(len(solution)):
-            filledSquares += self._drawShape(self.problemSpecs["shapeInfo"][coord], solution[coord])
+        if not self.occupiedDimensions:
+            lowX = 0
+            lowY = 0
+            highX = max(l[0] for l in solution)
+            highY = max(l[1] for l in solution)
+            return [lowX, highX, lowY, highY]
+
+        extents = [getGeneExtent(self.shapeTemplates[coord], solution[coord], True) for coord in range(len(solution))]
+        return [min(extent[0] for extent in extents), max(extent[1] for extent in extents),
+                min(extent[2] for extent in extents), max(extent[3] for extent in extents)]
 
-        lowX = 0
-        lowY = 0
-        highX = max(l[0] for l in solution)
-        highY = max(l[1] for l in solution)
-        return [lowX, highX, lowY, highY]
 
 
 class SolutionTracker:
-    def __init__(self):
+    def __init__(self, archiveSize=0):
         self.averageLengthFitnessRecords = []
         self.averageWidthFitnessRecords = []
         self.bestLengthFitnessRecords = []
         self.bestWidthFitnessRecords = []
-        self.bestFront = []
+        self.archive = ParetoArchive(archiveSize)
         self.frontChangeRecords = []
 
-    def addGeneration(self, population):
-        lengthFitnessArr = [solution.lengthFitness for solution in population]
-        widthFitnessArr = [solution.widthFitness for solution in population]
+    @property
+    def bestFront(self):
+        # Every non-dominated solution seen in the tracked generations.
+        return self.archive.getSolutions()
+
+    def addGeneration(self, population, levels=None):
+        lengthFitnessArr, widthFitnessArr = getFitnessColumns(population)
 
         genLengthMax = max(lengthFitnessArr)
         genLengthMaxIndex = lengthFitnessArr.index(genLengthMax)
@@ -273,97 +342,19 @@ class SolutionTracker:
         self.averageWidthFitnessRecords.append(genWidthAvg)
         self.bestWidthFitnessRecords.append(genWidthMax)
 
-        currFront = self.getLevels(population)[0]
+        if levels is None:
+            levels = self.getLevels(population)
+        currFront = levels[0]
         frontSolutions = [population[i] for i in currFront]
-        if not self.bestFront:
-            self.bestFront = frontSolutions
+        if not len(self.archive):
+            self.archive.insertAll(frontSolutions)
+        elif self.archive.insertAll(frontSolutions):
+            self.frontChangeRecords.append(1)
         else:
-            proportions = self.getFrontDominanceProportions(frontSolutions, self.bestFront)
-            if proportions[0] > proportions[1]:
-                self.bestFront = frontSolutions
-                self.frontChangeRecords.append(1)
-            else:
-                self.frontChangeRecords.append(0)
+            self.frontChangeRecords.append(0)
 
     def getLevels(self, population):
-        levels = []
-
-        for solution in range(len(population)):
-            if not levels:
-                levels.append([solution])
-                continue
-
-            levelFound = False
-            level = 0
-            while not levelFound:
-                if level > len(levels) - 1:
-                    levels.append([solution])
-                    break
-
-                toRemove = []
-                dominated = []
-                levelValid = True
-                levelCheck = levels[level]
-                for check in range(len(levelCheck)):
-                    if population[levelCheck[check]].lengthFitness > population[solution].lengthFitness:
-                        if population[levelCheck[check]].widthFitness >= population[solution].widthFitness:
-                            levelValid = False
-                            break
-                        else:
-                            continue
-                    if population[levelCheck[check]].widthFitness > population[solution].widthFitness:
-                        if population[levelCheck[check]].lengthFitness >= population[solution].lengthFitness:
-                            levelValid = False
-                            break
-                        else:
-                            continue
-                    if population[levelCheck[check]].lengthFitness == population[solution].lengthFitness and \
-                            population[levelCheck[check]].widthFitness == population[solution].widthFitness:
-                        continue
-                    else:
-                        toRemove.append(check)
-                        dominated.append(levelCheck[check])
-
-                if not levelValid:
-                    level += 1
-                    continue
-                else:
-                    newLevel = [populationIndex for index, populationIndex in enumerate(levelCheck) if index not in toRemove]
-                    newLevel.append(solution)
-                    levels[level] = newLevel
-                    if dominated:
-                        if level+1 > len(levels) - 1:
-                            levels.append(dominated)
-                        else:
-                            levels[level+1] += dominated
-                    levelFound = True
-
-        return levels
-
-    def getFrontDominanceProportions(self, front1, front2):
-        proportions = []
-        front1Num = 0
-        front2Num = 0
-        for solution in front1:
-            for check in front2:
-                if solution.lengthFitness > check.lengthFitness and solution.widthFitness >= check.widthFitness:
-                    front1Num += 1
-                    break
-                if solution.widthFitness > check.widthFitness and solution.lengthFitness >= check.lengthFitness:
-                    front1Num += 1
-                    break
-
-        for solution in front2:
-            for check in front1:
-                if solution.lengthFitness > check.lengthFitness and solution.widthFitness >= check.widthFitness:
-                    front2Num += 1
-                    break
-                if solution.widthFitness > check.widthFitness and solution.lengthFitness >= check.lengthFitness:
-                    front2Num += 1
-                    break
-        proportions.append(front1Num / len(front1))
-        proportions.append(front2Num / len(front2))
-        return proportions
+        return sortLevels(population)[0]
 
     def frontNoChange(self, generations):
         # Front Change Record
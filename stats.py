@@ -0,0 +1,182 @@
+import ast
+import atexit
+import mmap
+import struct
+import sys
+from array import array
+
+
+# Per-generation statistics are stored as one float64 .npy array with a row per
+# logged generation, so numpy.load(path, mmap_mode='r') reads it as well. The
+# header is padded to a fixed size and rewritten as rows are appended.
+STATS_COLUMNS = ("run", "island", "evals", "avgLength", "bestLength", "avgWidth", "bestWidth")
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+NPY_HEADER_SIZE = 128
+
+
+def _getNpyHeader(rows):
+    text = "{'descr': '<f8', 'fortran_order': False, 'shape': (" + str(rows) + ", " + \
+        str(len(STATS_COLUMNS)) + "), }"
+    text = text.ljust(NPY_HEADER_SIZE - len(NPY_MAGIC) - 3) + "\n"
+    return NPY_MAGIC + struct.pack("<H", len(text)) + text.encode("latin1")
+
+
+# Appends rows to a stats file. Rows are buffered until flush, which appends
+# them and then updates the row count in the header. Given a row count, the
+# writer continues an existing file from that row, dropping any rows after it.
+class StatsWriter:
+    def __init__(self, path, rows=0):
+        self.path = path
+        self.rows = rows
+        self.pending = array('d')
+        self.run = 0
+        self.island = 0
+        if rows == 0:
+            with open(path, 'wb') as file:
+                file.write(_getNpyHeader(0))
+        else:
+            with open(path, 'r+b') as file:
+                file.truncate(NPY_HEADER_SIZE + rows * len(STATS_COLUMNS) * self.pending.itemsize)
+                file.write(_getNpyHeader(rows))
+
+    def addGeneration(self, evals, bestLength, avgLength, bestWidth, avgWidth):
+        self.pending.extend((self.run, self.island, evals, avgLength, bestLength, avgWidth, bestWidth))
+
+    def flush(self):
+        if not self.pending:
+            return
+        if sys.byteorder != "little":
+            self.pending.byteswap()
+        with open(self.path, 'r+b') as file:
+            file.seek(NPY_HEADER_SIZE + self.rows * len(STATS_COLUMNS) * self.pending.itemsize)
+            file.write(self.pending.tobytes())
+            self.rows += len(self.pending) // len(STATS_COLUMNS)
+            file.seek(0)
+            file.write(_getNpyHeader(self.rows))
+        self.pending = array('d')
+
+
+# One writer per stats file, shared by every Logger writing to it, so the run
+# set by one Logger applies to generations logged by another.
+statsWriters = {}
+
+
+def createStatsWriter(path):
+    if path in statsWriters:
+        statsWriters[path].flush()
+    statsWriters[path] = StatsWriter(path)
+    return statsWriters[path]
+
+
+def resumeStatsWriter(path, rows):
+    statsWriters[path] = StatsWriter(path, rows)
+    return statsWriters[path]
+
+
+def flushStatsWriter(path):
+    if path in statsWriters:
+        statsWriters[path].flush()
+
+
+def getStatsWriter(path):
+    if path not in statsWriters:
+        return createStatsWriter(path)
+    return statsWriters[path]
+
+
+@atexit.register
+def flushStatsWriters():
+    for writer in statsWriters.values():
+        writer.flush()
+
+
+# Memory-mapped view of a stats file. table is a read-only 2-D memoryview
+# indexed as table[row, column], or None when the file holds no rows, since a
+# memoryview cannot have a dimension of 0. Columns and runs are returned as
+# views into the same mapping, so nothing is copied until values are read.
+# close() releases every view handed out; views a caller derived from them,
+# such as slices, must be released before it.
+class StatsFile:
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:len(NPY_MAGIC)] != NPY_MAGIC:
+            print("Stats file " + str(path) + " is not a version 1.0 .npy file.")
+            sys.exit()
+        headerLength = struct.unpack_from("<H", self.map, len(NPY_MAGIC))[0]
+        offset = len(NPY_MAGIC) + 2
+        header = ast.literal_eval(self.map[offset:offset + headerLength].decode("latin1"))
+        if header["descr"] != "<f8" or header["shape"][1] != len(STATS_COLUMNS) or sys.byteorder != "little":
+            print("Stats file " + str(path) + " does not hold native float64 statistics.")
+            sys.exit()
+
+        self.rows = header["shape"][0]
+        offset += headerLength
+        self.data = memoryview(self.map)[offset:offset + self.rows * len(STATS_COLUMNS) * 8]
+        self.values = self.data.cast('d')
+        self.table = None
+        if self.rows > 0:
+            self.table = self.data.cast('d', [self.rows, len(STATS_COLUMNS)])
+        self.runStarts = None
+        self.views = []
+
+    def getColumn(self, name):
+        # Strided view of one column over every row.
+        view = self._getColumn(name)
+        self.views.append(view)
+        return view
+
+    def _getColumn(self, name):
+        return self.values[STATS_COLUMNS.index(name)::len(STATS_COLUMNS)]
+
+    def getRuns(self):
+        # Row ranges of the runs, which are stored one after another.
+        if self.runStarts is None:
+            runs = self._getColumn("run")
+            self.runStarts = {}
+            for row in range(self.rows):
+                if runs[row] not in self.runStarts:
+                    self.runStarts[runs[row]] = [row, row + 1]
+                else:
+                    self.runStarts[runs[row]][1] = row + 1
+        return self.runStarts
+
+    def getRun(self, run):
+        # 2-D view of one run's rows.
+        start, end = self.getRuns()[run]
+        rowSize = len(STATS_COLUMNS) * 8
+        rows = self.data[start * rowSize:end * rowSize]
+        view = rows.cast('d', [end - start, len(STATS_COLUMNS)])
+        rows.release()
+        self.views.append(view)
+        return view
+
+    def getMeanCurve(self, name):
+        # Mean of a column at each generation over every run, or over every
+        # island of every run, counting each for as many generations as it lasted.
+        column = STATS_COLUMNS.index(name)
+        runs = self._getColumn("run")
+        islands = self._getColumn("island")
+        totals = []
+        counts = []
+        generation = 0
+        for row in range(self.rows):
+            if row > 0 and (runs[row] != runs[row - 1] or islands[row] != islands[row - 1]):
+                generation = 0
+            if generation == len(totals):
+                totals.append(0.0)
+                counts.append(0)
+            totals[generation] += self.values[row * len(STATS_COLUMNS) + column]
+            counts[generation] += 1
+            generation += 1
+        return [totals[generation] / counts[generation] for generation in range(len(totals))]
+
+    def close(self):
+        for view in self.views:
+            view.release()
+        self.views = []
+        if self.table is not None:
+            self.table.release()
+        self.values.release()
+        self.data.release()
+        self.map.close()
@@ -0,0 +1,63 @@
+import random
+from multiprocessing import Pool
+from queue import Queue
+from solution import SolutionGenerator
+from solution import Solution
+
+
+# Repairs and evaluates steady-state offspring for one process. Every
+# offspring comes with its own seed, so the repair does not depend on which
+# worker builds it.
+class OffspringWorker:
+    def __init__(self, configDict, problemSpecs):
+        self.rng = random.Random()
+        self.solutionGen = SolutionGenerator(problemSpecs, self.rng, configDict["dimensionMode"])
+        self.problemSpecs = self.solutionGen.problemSpecs
+
+    def buildOffspring(self, offspring, seed):
+        self.rng.seed(seed)
+        offspring = self.solutionGen.repairSolution(offspring)
+        dimensions = self.solutionGen.getSheetDimensionsConstrained(offspring)
+        solution = Solution(offspring, dimensions[1] + 1, dimensions[3] + 1)
+        solution.lengthFitness = self.problemSpecs["maxSheetLength"] - solution.length
+        solution.widthFitness = self.problemSpecs["sheetWidth"] - solution.width
+        return solution
+
+
+_worker = None
+
+
+def _initializeWorker(configDict, problemSpecs):
+    global _worker
+    _worker = OffspringWorker(configDict, problemSpecs)
+
+
+def _buildOffspringTask(task):
+    return _worker.buildOffspring(*task)
+
+
+# A process pool that builds offspring as they are submitted and hands them
+# back in the order they finish, so a slow repair never holds up the others.
+class OffspringPool:
+    def __init__(self, configDict, problemSpecs, workers):
+        self.pool = Pool(workers, _initializeWorker, (configDict, problemSpecs))
+        self.finished = Queue()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        # Offspring still being built are abandoned.
+        self.pool.terminate()
+        self.pool.join()
+
+    def submit(self, offspring, seed):
+        self.pool.apply_async(_buildOffspringTask, ((offspring, seed),), callback=self.finished.put,
+                              error_callback=self.finished.put)
+
+    def getOffspring(self):
+        # Waits for the next finished offspring.
+        result = self.finished.get()
+        if isinstance(result, BaseException):
+            raise result
+        return result
@@ -0,0 +1,197 @@
+import argparse
+import os
+import sys
+import time
+from multiprocessing import Pool
+from setup import Setup
+from log import Logger
+from pareto import ParetoArchive
+from problemcache import loadProblem
+from runner import executeRun
+from runner import getCompletedEvals
+from runner import replayRecords
+from main import ea
+from main import randomSearch
+
+
+# Runs every (problem, configuration) pair of a manifest. The runs of all
+# serial EA pairs go to one shared process pool, which hands each idle worker
+# the next run of any pair, and every worker loads each problem once. Island,
+# random search and parallel steady-state pairs bring their own processes, so
+# they are run one after another once the pool is done. Every pair writes its
+# own log and solution file to the output directory, and a summary table is
+# written next to them.
+workerPairs = []
+workerProblems = {}
+
+
+def readManifest(path):
+    # One "<problem-filepath> <configuration-filepath>" pair per line; blank
+    # lines and lines starting with # are skipped.
+    try:
+        with open(path, 'r') as file:
+            lines = file.readlines()
+    except FileNotFoundError:
+        print("Manifest file could not be opened.")
+        sys.exit()
+
+    pairs = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        paths = line.split()
+        if len(paths) != 2:
+            print("Invalid manifest line: " + line)
+            sys.exit()
+        pairs.append(paths)
+    return pairs
+
+
+def getPairName(problemPath, configPath):
+    return os.path.splitext(os.path.basename(problemPath))[0] + "-" + \
+        os.path.splitext(os.path.basename(configPath))[0]
+
+
+def setupPair(problemPath, configPath, outputDirectory):
+    # The shipped configurations share output files, so every pair's files are
+    # moved to the output directory under the pair's name.
+    setup = Setup([problemPath, configPath])
+    configDict = setup.configDict
+    prefix = os.path.join(outputDirectory, getPairName(problemPath, configPath))
+    configDict["logFilePath"] = prefix + "-log.txt"
+    configDict["solutionFilePath"] = prefix + "-solution.txt"
+    configDict["checkpointFilePath"] = prefix + "-log.txt.checkpoint"
+    if configDict["statsFilePath"]:
+        configDict["statsFilePath"] = prefix + "-stats.npy"
+    if configDict["metricsFilePath"]:
+        configDict["metricsFilePath"] = prefix + "-metrics.txt"
+    return setup
+
+
+def isPooled(configDict):
+    # Steady-state pairs with parallel workers need the workers for their offspring.
+    return configDict["algorithmType"] == "ea" and configDict["islandCount"] == 1 and \
+        (configDict["survivalStrategy"] != "steady-state" or configDict["parallelWorkers"] == 1)
+
+
+def _initializeWorker(pairs):
+    global workerPairs
+    workerPairs = pairs
+
+
+def _getWorkerProblem(configDict):
+    key = (configDict["problemPath"], configDict["problemCacheDirectory"])
+    if key not in workerProblems:
+        workerProblems[key] = loadProblem(*key)
+    return workerProblems[key]
+
+
+def _executeSweepTask(task):
+    pair, run = task
+    configDict = workerPairs[pair]
+    start = time.perf_counter()
+    records, front = executeRun(configDict, _getWorkerProblem(configDict), run)
+    return pair, run, records, front, time.perf_counter() - start
+
+
+def executeSweep(setups, workers):
+    # Returns the runs, evaluations, seconds and best front of every pooled
+    # pair. Runs finish in any order, so each pair's results are held back until
+    # they can be logged in run order.
+    pooled = [pair for pair in range(len(setups)) if isPooled(setups[pair].configDict)]
+    summaries = {}
+    loggers = {}
+    archives = {}
+    pending = {}
+    nextRun = {}
+    for pair in pooled:
+        configDict = setups[pair].configDict
+        loggers[pair] = Logger(configDict)
+        loggers[pair].createLog()
+        archives[pair] = ParetoArchive(configDict["archiveSize"])
+        pending[pair] = {}
+        nextRun[pair] = 0
+        summaries[pair] = [configDict["numRuns"], 0, 0.0, []]
+
+    tasks = [(pair, run) for pair in pooled for run in range(setups[pair].configDict["numRuns"])]
+    if not tasks:
+        return summaries
+    pairs = [setup.configDict for setup in setups]
+    with Pool(min(workers, len(tasks)), _initializeWorker, (pairs,)) as pool:
+        for pair, run, records, front, seconds in pool.imap_unordered(_executeSweepTask, tasks, 1):
+            summaries[pair][1] += getCompletedEvals(records)
+            summaries[pair][2] += seconds
+            pending[pair][run] = (records, front)
+            while nextRun[pair] in pending[pair]:
+                records, front = pending[pair].pop(nextRun[pair])
+                nextRun[pair] += 1
+                loggers[pair].addRunHeader(nextRun[pair])
+                replayRecords(loggers[pair], records)
+                archives[pair].insertAll(front)
+            if nextRun[pair] == pairs[pair]["numRuns"]:
+                summaries[pair][3] = archives[pair].getSolutions()
+                loggers[pair].logBestSolution(summaries[pair][3])
+    return summaries
+
+
+def formatFront(front):
+    return " ".join(str(solution.length) + "x" + str(solution.width)
+                    for solution in sorted(front, key=lambda solution: (solution.length, solution.width)))
+
+
+def writeSummary(path, names, summaries):
+    # Prints one line per pair and writes the same table to path. Throughput is
+    # evaluations per second of run time, summed over the pair's runs.
+    lines = ["pair".ljust(44) + "runs".rjust(6) + "evals".rjust(10) + "seconds".rjust(10) +
+             "evals/s".rjust(10) + "front".rjust(7) + "  best front (length x width)"]
+    for pair in range(len(names)):
+        runs, evals, seconds, front = summaries[pair]
+        throughput = "%.1f" % (evals / seconds) if seconds > 0 else "-"
+        lines.append(names[pair].ljust(44) + str(runs).rjust(6) + str(evals).rjust(10) +
+                     ("%.2f" % seconds).rjust(10) + throughput.rjust(10) + str(len(front)).rjust(7) +
+                     "  " + formatFront(front))
+    with open(path, 'w') as file:
+        file.write("\n".join(lines) + "\n")
+    print("\n".join(lines))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs every problem and configuration pair of a manifest.")
+    parser.add_argument("manifest", help="file with one '<problem-filepath> <configuration-filepath>' pair per line")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes of the shared pool")
+    parser.add_argument("--output-directory", default="sweep", help="directory of the logs, solutions and summary")
+    arguments = parser.parse_args()
+    if arguments.workers <= 0:
+        print("Invalid number of workers.")
+        sys.exit()
+
+    os.makedirs(arguments.output_directory, exist_ok=True)
+    manifest = readManifest(arguments.manifest)
+    names = [getPairName(problemPath, configPath) for problemPath, configPath in manifest]
+    if len(set(names)) != len(names):
+        print("Every pair of the manifest must have a different problem or configuration file name.")
+        sys.exit()
+    setups = [setupPair(problemPath, configPath, arguments.output_directory) for problemPath, configPath in manifest]
+    for pair in range(len(setups)):
+        if isPooled(setups[pair].configDict) and setups[pair].configDict["checkpointInterval"] > 0:
+            print("Checkpoints are not saved for the pooled runs of " + names[pair] + ".")
+
+    summaries = executeSweep(setups, arguments.workers)
+    for pair in range(len(setups)):
+        if pair in summaries:
+            continue
+        configDict = setups[pair].configDict
+        start = time.perf_counter()
+        if configDict["algorithmType"] == "ea":
+            evals, front = ea(setups[pair])
+        else:
+            evals, solution = randomSearch(setups[pair])
+            front = [solution] if solution is not None else []
+        summaries[pair] = [configDict["numRuns"], evals, time.perf_counter() - start, front]
+
+    writeSummary(os.path.join(arguments.output_directory, "summary.txt"), names, summaries)
+
+
+if __name__ == "__main__":
+    main()
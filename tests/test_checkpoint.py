@@ -0,0 +1,80 @@
+import os
+import random
+import tempfile
+import unittest
+from checkpoint import loadCheckpoint
+from checkpoint import saveCheckpoint
+from evalcache import EvaluationCache
+from pareto import ParetoArchive
+from population import PopulationStore
+from solution import Solution
+from solution import SolutionTracker
+
+
+def makeSolution(rng, numShapes):
+    genome = [[rng.randint(-20, 20), rng.randint(0, 20), rng.randint(0, 3)] for gene in range(numShapes)]
+    solution = Solution(genome, rng.randint(1, 50), rng.randint(1, 20))
+    solution.lengthFitness = rng.randint(0, 50)
+    solution.widthFitness = rng.randint(0, 20)
+    return solution
+
+
+class FakeEngine:
+    def __init__(self, rng):
+        self.evalsLeft = 120
+        self.evalsCompleted = 80
+        self.population = PopulationStore(4, [makeSolution(rng, 4) for solution in range(6)])
+        self.solutionTracker = SolutionTracker(3)
+        for generation in range(2):
+            self.solutionTracker.addGeneration(self.population)
+        self.evaluationCache = EvaluationCache(2)
+        for solution in self.population:
+            self.evaluationCache.put(tuple(value for gene in solution.shapeCoords for value in gene),
+                                     (rng.random() < 0.5, solution.length, solution.width))
+        self.evaluationCache.get(next(iter(self.evaluationCache.entries)))
+        self.uncountedHitsLeft = 17
+
+
+class CheckpointTest(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".ckpt")
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def assertSolutionsEqual(self, copies, solutions):
+        self.assertEqual([(copy.shapeCoords, copy.length, copy.width, copy.lengthFitness, copy.widthFitness)
+                          for copy in copies],
+                         [(solution.shapeCoords, solution.length, solution.width, solution.lengthFitness,
+                           solution.widthFitness) for solution in solutions])
+
+    def testRoundTripsRunState(self):
+        rng = random.Random(7)
+        engine = FakeEngine(rng)
+        archive = ParetoArchive()
+        archive.insertAll([makeSolution(rng, 4) for solution in range(5)])
+        random.seed(11)
+        state = random.getstate()
+        saveCheckpoint(self.path, 2, engine, archive, 345, 9)
+
+        checkpoint = loadCheckpoint(self.path, 3)
+        self.assertEqual((checkpoint["run"], checkpoint["evalsLeft"], checkpoint["evalsCompleted"],
+                          checkpoint["logOffset"], checkpoint["statsRows"]), (2, 120, 80, 345, 9))
+        self.assertEqual(checkpoint["rngState"], state)
+        self.assertSolutionsEqual(checkpoint["population"], list(engine.population))
+        self.assertSolutionsEqual(checkpoint["archive"], archive.getSolutions())
+
+        tracker = checkpoint["tracker"]
+        self.assertEqual(tracker.averageLengthFitnessRecords, engine.solutionTracker.averageLengthFitnessRecords)
+        self.assertEqual(tracker.bestWidthFitnessRecords, engine.solutionTracker.bestWidthFitnessRecords)
+        self.assertEqual(tracker.frontChangeRecords, engine.solutionTracker.frontChangeRecords)
+        self.assertSolutionsEqual(tracker.bestFront, engine.solutionTracker.bestFront)
+
+        cache = engine.evaluationCache
+        self.assertEqual(checkpoint["cacheCounters"], [cache.hits, cache.misses, cache.evictions, 17])
+        self.assertEqual(checkpoint["cacheEntries"], list(cache.entries.items()))
+
+
+if __name__ == "__main__":
+    unittest.main()
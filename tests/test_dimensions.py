@@ -0,0 +1,53 @@
+import random
+import unittest
+from dimensions import getExtremeDimensions
+from dimensions import getGeneExtent
+from dimensions import getSheetExtremes
+from dimensions import updateSheetExtremes
+from shapes import ShapeTemplate
+
+
+def getRandomGene(rng):
+    # A narrow range of coordinates so that genes often share a side.
+    return [rng.randint(0, 4), rng.randint(0, 4), rng.randint(0, 3)]
+
+
+class SheetExtremesTest(unittest.TestCase):
+    templates = [ShapeTemplate(steps) for steps in (["R2", "U1"], ["D3"], ["L1", "D1", "R1"], [])] * 3
+
+    def testDimensionsMatchGeneExtents(self):
+        rng = random.Random(2)
+        for occupied in (False, True):
+            for trial in range(50):
+                genome = [getRandomGene(rng) for gene in range(len(self.templates))]
+                extents = [getGeneExtent(self.templates[geneNum], genome[geneNum], occupied)
+                           for geneNum in range(len(genome))]
+                expected = [min(extent[0] for extent in extents), max(extent[1] for extent in extents),
+                            min(extent[2] for extent in extents), max(extent[3] for extent in extents)]
+                if not occupied:
+                    expected[0] = expected[2] = 0
+                dimensions = getExtremeDimensions(getSheetExtremes(self.templates, genome, occupied), occupied)
+                self.assertEqual(dimensions, expected)
+
+    def testUpdateMatchesScan(self):
+        rng = random.Random(4)
+        updated = 0
+        for occupied in (False, True):
+            for trial in range(500):
+                parent = [getRandomGene(rng) for gene in range(len(self.templates))]
+                child = [gene[:] for gene in parent]
+                geneNums = sorted(rng.sample(range(len(child)), rng.randint(0, 3)))
+                for geneNum in geneNums:
+                    child[geneNum] = getRandomGene(rng)
+
+                extremes = updateSheetExtremes(self.templates, getSheetExtremes(self.templates, parent, occupied),
+                                               [parent[geneNum] for geneNum in geneNums], child, geneNums,
+                                               occupied)
+                if extremes is not None:
+                    self.assertEqual(extremes, getSheetExtremes(self.templates, child, occupied))
+                    updated += 1
+        self.assertGreater(updated, 500)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+from evalcache import EvaluationCache
+
+
+class EvaluationCacheTest(unittest.TestCase):
+    def testEvictsLeastRecentlyUsedEntry(self):
+        cache = EvaluationCache(2)
+        cache.put((0, 1, 2), (True, 5, 3))
+        cache.put((3, 4, 0), (True, 6, 4))
+        self.assertEqual(cache.get((0, 1, 2)), (True, 5, 3))
+        cache.put((5, 0, 1), (True, 7, 2))
+        self.assertIsNone(cache.get((3, 4, 0)))
+        self.assertEqual(list(cache.entries), [(0, 1, 2), (5, 0, 1)])
+        self.assertEqual((cache.hits, cache.misses, cache.evictions), (1, 1, 1))
+
+    def testInvalidEntryCountsAsMiss(self):
+        cache = EvaluationCache(2)
+        cache.put((0, 1, 2), (False, 5, 3))
+        self.assertEqual(cache.get((0, 1, 2)), (False, 5, 3))
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+    def testRestoreKeepsOrderAndCounters(self):
+        cache = EvaluationCache(3)
+        cache.restore([((0, 1, 2), (True, 5, 3)), ((3, 4, 0), (False, 6, 4))], 4, 9, 2)
+        cache.put((5, 0, 1), (True, 7, 2))
+        cache.put((6, 1, 1), (True, 8, 2))
+        self.assertEqual(list(cache.entries), [(3, 4, 0), (5, 0, 1), (6, 1, 1)])
+        self.assertEqual((cache.hits, cache.misses, cache.evictions), (4, 9, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
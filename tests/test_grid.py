@@ -0,0 +1,89 @@
+import random
+import unittest
+from grid import AnchorIndex
+from grid import OccupancyGrid
+from grid import Skyline
+from shapes import ShapeTemplate
+
+
+# Stands in for an rng so that every choice of AnchorIndex.sample can be drawn.
+class FixedChoice:
+    def __init__(self, choice):
+        self.choice = choice
+
+    def randint(self, low, high):
+        return low + self.choice
+
+
+class AnchorIndexTest(unittest.TestCase):
+    def getFeasiblePlacements(self, grid, template):
+        # Every placement the grid accepts, found by trying the whole sheet.
+        placements = []
+        for rotation in range(4):
+            for x in range(-grid.length, grid.length):
+                for y in range(-grid.width, grid.width):
+                    if grid.fits(template, [x, y, rotation]):
+                        placements.append((x, y, rotation))
+        return placements
+
+    def fillGrid(self, grid, templates, count, rng):
+        for shape in range(count):
+            template = rng.choice(templates)
+            placement = [rng.randint(0, grid.length - 1), rng.randint(0, grid.width - 1), rng.randint(0, 3)]
+            if grid.fits(template, placement):
+                grid.place(template, placement)
+
+    def testSamplesEveryFeasiblePlacementOnce(self):
+        rng = random.Random(7)
+        templates = [ShapeTemplate(steps) for steps in (["R2", "U1"], ["D3"], ["L1", "D1", "R1"], [])]
+        for trial in range(20):
+            grid = OccupancyGrid(rng.randint(3, 9), rng.randint(3, 7))
+            self.fillGrid(grid, templates, rng.randint(0, 12), rng)
+            for template in templates:
+                index = AnchorIndex(grid, template)
+                expected = self.getFeasiblePlacements(grid, template)
+                self.assertEqual(index.getFeasibleCount(), len(expected))
+                sampled = [tuple(index.sample(FixedChoice(choice))) for choice in range(len(expected))]
+                self.assertEqual(sorted(sampled), sorted(expected))
+
+    def testFullSheetHasNoPlacement(self):
+        template = ShapeTemplate(["R1"])
+        grid = OccupancyGrid(2, 1)
+        grid.place(template, [0, 0, 0])
+        index = AnchorIndex(grid, template)
+        self.assertEqual(index.getFeasibleCount(), 0)
+        self.assertIsNone(index.sample(random.Random(1)))
+
+
+class SkylineTest(unittest.TestCase):
+    templates = [ShapeTemplate(steps) for steps in (["R2", "U1"], ["D3"], ["L1", "D1", "R1"], [], ["U2", "R1"])]
+
+    def getLowestPlacement(self, skyline, template):
+        # The lowest resting anchor found by trying every x, y and rotation.
+        best = None
+        for rotation in range(4):
+            for y in range(-skyline.width, skyline.width):
+                columns = [(offset[0], y + offset[1]) for offset in template.offsets[rotation]]
+                if any(not 0 <= column < skyline.width for low, column in columns):
+                    continue
+                x = max(max(skyline.heights[column] - low, -low) for low, column in columns)
+                if best is None or (x, y) < (best[0], best[1]):
+                    best = [x, y, rotation]
+        return best
+
+    def testDroppedShapesRestLowestWithoutOverlapping(self):
+        rng = random.Random(9)
+        for trial in range(20):
+            skyline = Skyline(rng.randint(3, 7))
+            grid = OccupancyGrid(60, skyline.width)
+            for shape in range(12):
+                template = rng.choice(self.templates)
+                placement = skyline.getLowestPlacement(template)
+                self.assertEqual(placement, self.getLowestPlacement(skyline, template))
+                self.assertTrue(grid.fits(template, placement))
+                grid.place(template, placement)
+                skyline.place(template, placement)
+
+
+if __name__ == "__main__":
+    unittest.main()
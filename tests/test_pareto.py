@@ -0,0 +1,147 @@
+import random
+import unittest
+from pareto import ParetoArchive
+from pareto import ParetoRanking
+from pareto import dominates
+from pareto import getMostCrowded
+from pareto import sortLevels
+from population import PopulationStore
+from solution import Solution
+
+
+def makePopulation(rng, size, valueRange):
+    population = []
+    for index in range(size):
+        solution = Solution([], 0, 0)
+        solution.lengthFitness = rng.randint(0, valueRange)
+        solution.widthFitness = rng.randint(0, valueRange)
+        population.append(solution)
+    return population
+
+
+def getBruteForceLevels(population, indices=None):
+    # Peels off the non-dominated members of what is left, one level at a time.
+    remaining = list(range(len(population))) if indices is None else list(indices)
+    levels = []
+    while remaining:
+        level = [index for index in remaining
+                 if not any(dominates(population[other], population[index]) for other in remaining)]
+        levels.append(level)
+        remaining = [index for index in remaining if index not in level]
+    return levels
+
+
+class SortLevelsTest(unittest.TestCase):
+    def testMatchesBruteForce(self):
+        rng = random.Random(11)
+        for trial in range(200):
+            population = makePopulation(rng, rng.randint(0, 40), rng.choice((3, 10, 1000)))
+            levels, ranks = sortLevels(population)
+            expected = getBruteForceLevels(population)
+            self.assertEqual(levels, expected)
+            for level in range(len(levels)):
+                for index in levels[level]:
+                    self.assertEqual(ranks[index], level)
+            self.assertEqual(sortLevels(PopulationStore(0, population)), (levels, ranks))
+
+    def testIdenticalSolutionsShareALevel(self):
+        population = makePopulation(random.Random(3), 1, 5) * 4
+        self.assertEqual(sortLevels(population)[0], [[0, 1, 2, 3]])
+
+
+class ParetoRankingTest(unittest.TestCase):
+    def assertMatchesBruteForce(self, ranking, population, indices):
+        expected = getBruteForceLevels(population, sorted(indices))
+        self.assertEqual(ranking.getLevels(), expected)
+        for level in range(len(expected)):
+            for index in expected[level]:
+                self.assertEqual(ranking.ranks[index], level)
+
+    def testRemoveMatchesBruteForce(self):
+        rng = random.Random(5)
+        for trial in range(100):
+            population = makePopulation(rng, rng.randint(1, 30), rng.choice((3, 10, 1000)))
+            ranking = ParetoRanking(population)
+            remaining = list(range(len(population)))
+            while remaining:
+                index = remaining.pop(rng.randrange(len(remaining)))
+                ranking.remove(index)
+                self.assertEqual(ranking.ranks[index], -1)
+                self.assertMatchesBruteForce(ranking, population, remaining)
+
+    def testInsertAndMoveOnStoreMatchBruteForce(self):
+        # Each new row is inserted and a random row is evicted, with the last
+        # row taking its place, as steady-state survival does.
+        rng = random.Random(8)
+        for trial in range(50):
+            valueRange = rng.choice((3, 10, 1000))
+            store = PopulationStore(0, makePopulation(rng, rng.randint(1, 20), valueRange))
+            ranking = ParetoRanking(store)
+            for insertion in range(30):
+                store.append(makePopulation(rng, 1, valueRange)[0])
+                newIndex = len(store) - 1
+                ranking.insert(newIndex)
+                self.assertMatchesBruteForce(ranking, list(store), range(len(store)))
+
+                removed = rng.randrange(len(store))
+                ranking.remove(removed)
+                if removed != newIndex:
+                    ranking.move(newIndex, removed)
+                    store.replace(removed, store[newIndex])
+                store.pop()
+                ranking.ranks.pop()
+                self.assertMatchesBruteForce(ranking, list(store), range(len(store)))
+
+
+class MostCrowdedTest(unittest.TestCase):
+    def testPicksSmallestInteriorDistance(self):
+        self.assertEqual(getMostCrowded([-9, -8, -7, -2, 0], [0, 1, 2, 6, 9]), 1)
+        self.assertEqual(getMostCrowded([-9, -5, -4, -3, 0], [0, 5, 6, 7, 9]), 2)
+
+    def testFrontWithoutInteriorGivesSecondOrOnlyMember(self):
+        self.assertEqual(getMostCrowded([-5, 0], [0, 5]), 1)
+        self.assertEqual(getMostCrowded([-5], [5]), 0)
+
+
+class ParetoArchiveTest(unittest.TestCase):
+    def getFitness(self, solutions):
+        return [(solution.lengthFitness, solution.widthFitness) for solution in solutions]
+
+    def testMatchesBruteForceFront(self):
+        rng = random.Random(9)
+        for trial in range(100):
+            population = makePopulation(rng, rng.randint(0, 40), rng.choice((3, 10, 1000)))
+            archive = ParetoArchive()
+            for count in range(len(population)):
+                archive.insert(population[count])
+                seen = population[:count + 1]
+                front = set(self.getFitness(seen[index] for index in getBruteForceLevels(seen)[0]))
+                self.assertEqual(self.getFitness(archive.getSolutions()), sorted(front, reverse=True))
+
+    def testInsertReportsChanges(self):
+        archive = ParetoArchive()
+        solution, dominated, equal = makePopulation(random.Random(1), 3, 0)
+        solution.lengthFitness = solution.widthFitness = 5
+        dominated.lengthFitness = 4
+        equal.lengthFitness = equal.widthFitness = 5
+        self.assertTrue(archive.insert(solution))
+        self.assertFalse(archive.insert(dominated))
+        self.assertFalse(archive.insert(equal))
+        self.assertEqual(len(archive), 1)
+
+    def testCapacityKeepsExtremes(self):
+        rng = random.Random(13)
+        for trial in range(100):
+            capacity = rng.randint(2, 6)
+            archive = ParetoArchive(capacity)
+            population = makePopulation(rng, rng.randint(1, 60), 1000)
+            archive.insertAll(population)
+            members = archive.getSolutions()
+            self.assertLessEqual(len(members), capacity)
+            self.assertEqual(getBruteForceLevels(members)[0], list(range(len(members))))
+            self.assertEqual(members[0].lengthFitness, max(solution.lengthFitness for solution in population))
+            self.assertEqual(members[-1].widthFitness, max(solution.widthFitness for solution in population))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import random
+import unittest
+from population import PopulationStore
+from solution import Solution
+
+
+def makeSolution(rng, numShapes):
+    genome = [[rng.randint(-20, 20), rng.randint(0, 20), rng.randint(0, 3)] for gene in range(numShapes)]
+    solution = Solution(genome, rng.randint(1, 50), rng.randint(1, 20))
+    solution.lengthFitness = rng.randint(0, 50)
+    solution.widthFitness = rng.randint(0, 20)
+    return solution
+
+
+class PopulationStoreTest(unittest.TestCase):
+    def assertRowsEqual(self, store, solutions):
+        self.assertEqual(len(store), len(solutions))
+        for row, solution in enumerate(solutions):
+            self.assertEqual(store[row].shapeCoords, solution.shapeCoords)
+            self.assertEqual((store[row].length, store[row].width), (solution.length, solution.width))
+            self.assertEqual((store.lengthFitness[row], store.widthFitness[row]),
+                             (solution.lengthFitness, solution.widthFitness))
+
+    def testRowsFollowKeepReplaceAndPop(self):
+        rng = random.Random(3)
+        solutions = [makeSolution(rng, 4) for solution in range(8)]
+        store = PopulationStore(4, solutions)
+        lengthFitness = store.lengthFitness
+        self.assertRowsEqual(store, solutions)
+
+        order = [5, 0, 7, 2, 2]
+        store.keep(order)
+        solutions = [solutions[row] for row in order]
+        self.assertRowsEqual(store, solutions)
+        self.assertIs(store.lengthFitness, lengthFitness)
+
+        solutions[1] = makeSolution(rng, 4)
+        store.replace(1, solutions[1])
+        self.assertRowsEqual(store, solutions)
+
+        self.assertEqual(store.pop().shapeCoords, solutions.pop().shapeCoords)
+        self.assertRowsEqual(store, solutions)
+
+    def testCrossoverTakesMaskedGenesFromSecondParent(self):
+        rng = random.Random(5)
+        solutions = [makeSolution(rng, 6) for solution in range(2)]
+        store = PopulationStore(6, solutions)
+        mask = 0b100101
+        expected = [list(solutions[1 if mask >> gene & 1 else 0].shapeCoords[gene]) for gene in range(6)]
+        genome, changedGenes = store.crossover(0, 1, mask)
+        self.assertEqual(genome, expected)
+        self.assertEqual(changedGenes, [0, 2, 5])
+
+
+if __name__ == "__main__":
+    unittest.main()
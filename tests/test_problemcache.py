@@ -0,0 +1,48 @@
+import os
+import shutil
+import tempfile
+import unittest
+from problemcache import loadProblem
+
+
+PROBLEM = "7 3\nR2 U1 L1\nD3\nU2 R2 D1 L1\n"
+
+
+class ProblemCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.problemPath = os.path.join(self.directory, "problem.txt")
+        with open(self.problemPath, 'w') as file:
+            file.write(PROBLEM)
+        self.cacheDirectory = os.path.join(self.directory, "cache")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def assertProblemsEqual(self, cached, compiled):
+        for key in ("shapeInfo", "sheetWidth", "numOfShapes", "maxSheetLength"):
+            self.assertEqual(cached[key], compiled[key])
+        for cachedTemplate, template in zip(cached["shapeTemplates"], compiled["shapeTemplates"]):
+            self.assertEqual([list(offsets) for offsets in cachedTemplate.offsets],
+                             [list(offsets) for offsets in template.offsets])
+            self.assertEqual(cachedTemplate.bounds, template.bounds)
+            self.assertEqual(cachedTemplate.getLinearOffsets(7), template.getLinearOffsets(7))
+
+    def testCachedProblemMatchesCompiledProblem(self):
+        compiled = loadProblem(self.problemPath, None)
+        self.assertProblemsEqual(loadProblem(self.problemPath, self.cacheDirectory), compiled)
+        self.assertEqual(len(os.listdir(self.cacheDirectory)), 1)
+        self.assertProblemsEqual(loadProblem(self.problemPath, self.cacheDirectory), compiled)
+
+    def testTruncatedEntryIsCompiledAgain(self):
+        compiled = loadProblem(self.problemPath, self.cacheDirectory)
+        entryPath = os.path.join(self.cacheDirectory, os.listdir(self.cacheDirectory)[0])
+        with open(entryPath, 'rb') as file:
+            data = file.read()
+        with open(entryPath, 'wb') as file:
+            file.write(data[:-4])
+        self.assertProblemsEqual(loadProblem(self.problemPath, self.cacheDirectory), compiled)
+
+
+if __name__ == "__main__":
+    unittest.main()
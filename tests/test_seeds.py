@@ -0,0 +1,31 @@
+import os
+import tempfile
+import unittest
+from seeds import readSeedGenomes
+from seeds import writeBinarySeeds
+
+
+class SeedFileTest(unittest.TestCase):
+    genomes = [[[0, 1, 2], [3, 4, 0]], [[5, 0, 1], [-2, 7, 3]], [[40000, 2, 0], [1, 1, 1]]]
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def testReadsTextGenomesSkippingBlankLines(self):
+        with open(self.path, 'w') as file:
+            file.write("2\n0,1,2\n3,4,0\n\n5,0,1\n-2,7,3\n\n\n9,9,9\n9,9,9\n")
+        self.assertEqual(list(readSeedGenomes(self.path, 2)), self.genomes[:2])
+
+    def testBinaryGenomesRoundTrip(self):
+        writeBinarySeeds(self.path, self.genomes[:2])
+        self.assertEqual(list(readSeedGenomes(self.path, 2)), self.genomes[:2])
+        writeBinarySeeds(self.path, self.genomes)
+        self.assertEqual(list(readSeedGenomes(self.path, 2)), self.genomes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import random
+import unittest
+from selection import CumulativeSampler
+from selection import sampleWithoutReplacement
+
+
+class SelectionTest(unittest.TestCase):
+    weights = [100, 0, 50, 25, 0, 12.5]
+
+    def testSamplerDrawsInProportionToWeights(self):
+        rng = random.Random(1)
+        sampler = CumulativeSampler(self.weights)
+        draws = [sampler.sample(rng) for draw in range(20000)]
+        for index, weight in enumerate(self.weights):
+            self.assertAlmostEqual(draws.count(index) / len(draws), weight / sum(self.weights), delta=0.02)
+        distinct = sampler.sampleDistinct(2, rng)
+        self.assertEqual(len(set(distinct)), 2)
+
+    def testSampleWithoutReplacementDrawsWeightedIndicesFirst(self):
+        rng = random.Random(2)
+        firsts = [0] * len(self.weights)
+        for trial in range(5000):
+            sample = sampleWithoutReplacement(self.weights, 5, rng)
+            self.assertEqual(len(set(sample)), 5)
+            self.assertEqual(set(sample[:4]), {0, 2, 3, 5})
+            firsts[sample[0]] += 1
+        for index, weight in enumerate(self.weights):
+            self.assertAlmostEqual(firsts[index] / 5000, weight / sum(self.weights), delta=0.03)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from array import array
+from solution import Genome
+from solution import Solution
+from solution import packSolutions
+from solution import unpackSolutions
+
+
+def makeSolution(shapeCoords, length, width, lengthFitness, widthFitness):
+    solution = Solution(shapeCoords, length, width)
+    solution.lengthFitness = lengthFitness
+    solution.widthFitness = widthFitness
+    return solution
+
+
+class PackSolutionsTest(unittest.TestCase):
+    def assertRoundTrips(self, solutions):
+        unpacked = unpackSolutions(packSolutions(solutions))
+        self.assertEqual(len(unpacked), len(solutions))
+        for solution, copy in zip(solutions, unpacked):
+            self.assertEqual(copy.shapeCoords, solution.shapeCoords)
+            self.assertEqual((copy.length, copy.width, copy.lengthFitness, copy.widthFitness),
+                             (solution.length, solution.width, solution.lengthFitness, solution.widthFitness))
+
+    def testRoundTripsSmallGenes(self):
+        self.assertRoundTrips([makeSolution([[0, 1, 2], [-3, 4, 0]], 5, 6, 70, 8),
+                               makeSolution([[9, 0, 3], [1, 1, 1]], 10, 2, 65, 12)])
+
+    def testRoundTripsGenesBeyondSixteenBits(self):
+        self.assertRoundTrips([makeSolution([[40000, -40000, 1]], 40001, 3, -5, 0)])
+
+    def testRoundTripsNoSolutions(self):
+        self.assertRoundTrips([])
+
+
+class GenomeTest(unittest.TestCase):
+    genes = [[0, 1, 2], [-3, 4, 0], [9, 0, 3], [1, 1, 1]]
+
+    def testReadsLikeListOfGenes(self):
+        genome = Genome(self.genes)
+        self.assertEqual(len(genome), 4)
+        self.assertEqual(genome[1], (-3, 4, 0))
+        self.assertEqual(genome[-1], (1, 1, 1))
+        self.assertEqual(list(genome), [tuple(gene) for gene in self.genes])
+        self.assertEqual(genome.tolist(), self.genes)
+        with self.assertRaises(IndexError):
+            genome[4]
+
+    def testSlicesAreGenomes(self):
+        genome = Genome(self.genes)
+        self.assertEqual(genome[1:3], Genome(self.genes[1:3]))
+        self.assertEqual(genome[::2], Genome(self.genes[::2]))
+        self.assertEqual(genome[::-1].tolist(), self.genes[::-1])
+        self.assertEqual(len(genome[3:1]), 0)
+
+    def testEqualityIgnoresTypecode(self):
+        packed = Genome(self.genes)
+        wide = Genome.fromValues(array('l', packed.values))
+        self.assertEqual(packed, wide)
+        self.assertEqual(hash(packed), hash(wide))
+        self.assertNotEqual(packed, Genome(self.genes[:3]))
+
+
+if __name__ == "__main__":
+    unittest.main()
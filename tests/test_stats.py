@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+from stats import STATS_COLUMNS
+from stats import StatsFile
+from stats import StatsWriter
+
+
+class StatsFileTest(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".npy")
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def writeRuns(self, generations):
+        writer = StatsWriter(self.path)
+        for run in range(len(generations)):
+            writer.run = run + 1
+            for generation in range(generations[run]):
+                writer.addGeneration(generation * 10, 2.0 * generation, generation, run, 0.5)
+            writer.flush()
+
+    def testRunsAreTwoDimensionalViews(self):
+        self.writeRuns([3, 2])
+        statsFile = StatsFile(self.path)
+        run = statsFile.getRun(2)
+        self.assertEqual(run.shape, (2, len(STATS_COLUMNS)))
+        self.assertEqual(run[1, STATS_COLUMNS.index("evals")], 10)
+        self.assertEqual(run[1, STATS_COLUMNS.index("bestLength")], 2.0)
+        self.assertEqual(statsFile.getColumn("run").tolist(), [1, 1, 1, 2, 2])
+        self.assertEqual(statsFile.getMeanCurve("bestLength"), [0.0, 2.0, 4.0])
+        statsFile.close()
+        with self.assertRaises(ValueError):
+            run[0, 0]
+
+    def testEmptyFileHasNoTable(self):
+        StatsWriter(self.path)
+        statsFile = StatsFile(self.path)
+        self.assertIsNone(statsFile.table)
+        self.assertEqual(statsFile.getRuns(), {})
+        statsFile.close()
+
+
+if __name__ == "__main__":
+    unittest.main()